@@ -3,13 +3,36 @@ Dependencies for authentication and authorization - MongoDB version
 """
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from typing import Optional
+import time
+from typing import Dict, Optional
 from app.models_mongo.users import User, UserRole, UserStatus
 from app.services.auth_service import decode_access_token, JWT_TYPE_MFA_PENDING
+from app.utils.ttl_cache import TTLCache
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Users resolved from a bearer token, so repeat requests skip the Mongo lookup.
+# Entries are (user snapshot, token exp, user cache version); each request gets
+# its own copy of the snapshot.
+TOKEN_USER_CACHE_SECONDS = 30
+TOKEN_USER_CACHE_MAXSIZE = 4096
+_token_user_cache = TTLCache(ttl_seconds=TOKEN_USER_CACHE_SECONDS, maxsize=TOKEN_USER_CACHE_MAXSIZE)
+
+# Per-user version, bumped on writes to that user; cached entries with an older
+# version are stale. One small int per user ever written. _user_cache_writes
+# counts all bumps, so a lookup that overlapped a write is not cached.
+_user_cache_versions: Dict[str, int] = {}
+_user_cache_writes = 0
+
+
+def invalidate_cached_user(user_id) -> None:
+    """Forget one user's cached token entries; call after writes that change that user"""
+    global _user_cache_writes
+    key = str(user_id)
+    _user_cache_versions[key] = _user_cache_versions.get(key, 0) + 1
+    _user_cache_writes += 1
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme)
@@ -29,6 +52,17 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    cached = _token_user_cache.get(token)
+    if cached is not None:
+        snapshot, expires_at, version = cached
+        if (
+            expires_at > time.time()
+            and version == _user_cache_versions.get(str(snapshot.id), 0)
+            and snapshot.can_login()
+        ):
+            return snapshot.model_copy(deep=True)
+        _token_user_cache.pop(token)
+    
     try:
         # Decode token
         payload = decode_access_token(token)
@@ -49,6 +83,7 @@ async def get_current_user(
         logger.debug(f"Looking up user: {username}")
         
         # Get user from database
+        writes_before_lookup = _user_cache_writes
         user = await User.find_one({"username": username})
         if user is None:
             logger.warning(f"User not found in database: {username}")
@@ -63,6 +98,10 @@ async def get_current_user(
             )
         
         logger.debug(f"User authenticated successfully: {username}")
+        expires_at = payload.get("exp")
+        if expires_at is not None and writes_before_lookup == _user_cache_writes:
+            version = _user_cache_versions.get(str(user.id), 0)
+            _token_user_cache.set(token, (user.model_copy(deep=True), expires_at, version))
         return user
         
     except HTTPException:
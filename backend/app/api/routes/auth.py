@@ -2,10 +2,12 @@
 API routes for authentication - MongoDB version
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
 import logging
 import base64
 import io
 from typing import Optional, Union
+from pymongo.errors import DuplicateKeyError
 
 import qrcode
 
@@ -50,7 +52,7 @@ from app.services.totp_service import (
     verify_totp_code,
 )
 from app.utils.totp_secret_crypto import encrypt_totp_secret, decrypt_totp_secret
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, invalidate_cached_user
 from app.utils.validators import sanitize_input, encode_special_chars
 
 logger = logging.getLogger(__name__)
@@ -58,6 +60,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+async def _save_user(user: User) -> None:
+    """Save user and drop their cached token entries so the next request sees the change."""
+    await user.save()
+    invalidate_cached_user(user.id)
+
+
 def _access_token_for_user(user: User) -> str:
     return create_access_token(
         {
@@ -81,7 +89,7 @@ async def _department_name_for_user(user: User) -> Optional[str]:
 async def build_user_response(user: User) -> UserResponse:
     department_name = await _department_name_for_user(user)
     return UserResponse(
-        id=str(user.id) if user.id is not None else "",
+        id=user.id,
         username=user.username,
         email=user.email,
         role=user.role,
@@ -90,7 +98,7 @@ async def build_user_response(user: User) -> UserResponse:
         created_at=user.created_at,
         approved_at=user.approved_at,
         last_login=user.last_login,
-        approved_by=str(user.approved_by) if user.approved_by else None,
+        approved_by=user.approved_by,
         rejection_reason=user.rejection_reason,
         department_id=getattr(user, "department_id", None),
         department_name=department_name,
@@ -152,24 +160,23 @@ async def register(
     # Encode special characters
     encoded_username = encode_special_chars(sanitized_username)
     
-    # Check if username already exists
-    existing_user = await User.find_one({"username": encoded_username})
+    # Check username and email in one query (before paying for password hashing)
+    existing_user = await User.find_one(
+        {"$or": [{"username": encoded_username}, {"email": sanitized_email}]}
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
-    # Check if email already exists
-    existing_email = await User.find_one({"email": sanitized_email})
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail=(
+                "Username already registered"
+                if existing_user.username == encoded_username
+                else "Email already registered"
+            )
         )
     
     # Create new user
-    hashed_password = get_password_hash(sanitized_password)
+    # bcrypt is CPU-bound; run it in a worker thread so the event loop keeps serving
+    hashed_password = await asyncio.to_thread(get_password_hash, sanitized_password)
     new_user = User(
         username=encoded_username,
         email=sanitized_email,
@@ -180,10 +187,17 @@ async def register(
         department_id=user_data.department_id
     )
     
-    await new_user.insert()
+    # A concurrent registration can still win the race; the unique indexes catch it
+    try:
+        await new_user.insert()
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
     
     return UserResponse(
-        id=str(new_user.id),
+        id=new_user.id,
         username=new_user.username,
         email=new_user.email,
         role=new_user.role,
@@ -192,7 +206,7 @@ async def register(
         created_at=new_user.created_at,
         approved_at=new_user.approved_at,
         last_login=new_user.last_login,
-        approved_by=str(new_user.approved_by) if new_user.approved_by else None,
+        approved_by=new_user.approved_by,
         rejection_reason=new_user.rejection_reason,
         department_id=new_user.department_id,
         department_name=department_name,
@@ -252,7 +266,7 @@ async def login(
         
         now = get_current_time()
         if clear_expired_lock(user, now):
-            await user.save()
+            await _save_user(user)
 
         if user.is_login_locked(now):
             secs = retry_after_seconds(user, now)
@@ -264,7 +278,9 @@ async def login(
 
         # Verify password
         try:
-            password_valid = verify_password(login_data.password, user.hashed_password)
+            password_valid = await asyncio.to_thread(
+                verify_password, login_data.password, user.hashed_password
+            )
         except Exception as e:
             logger.error(f"Error verifying password: {e}")
             import traceback
@@ -277,7 +293,7 @@ async def login(
         if not password_valid:
             logger.warning(f"Invalid password for user: {user.username}")
             just_locked = record_failed_password(user)
-            await user.save()
+            await _save_user(user)
             if just_locked:
                 logger.warning(f"Login lockout activated for user: {user.username}")
                 secs = retry_after_seconds(user, get_current_time())
@@ -296,7 +312,7 @@ async def login(
         
         # Check if user can login
         if not user.can_login():
-            await user.save()
+            await _save_user(user)
             logger.warning(f"User cannot login: {user.username}, status: {user.status.value}, is_active: {user.is_active}")
             if user.status == UserStatus.PENDING:
                 raise HTTPException(
@@ -319,7 +335,7 @@ async def login(
         now = get_current_time()
         if getattr(user, "totp_enabled", False):
             if clear_expired_mfa_lock(user, now):
-                await user.save()
+                await _save_user(user)
             if user.is_mfa_locked(now):
                 secs = mfa_retry_after_seconds(user, now)
                 raise HTTPException(
@@ -346,7 +362,7 @@ async def login(
             )
 
         user.last_login = get_current_time()
-        await user.save()
+        await _save_user(user)
 
         try:
             access_token = _access_token_for_user(user)
@@ -411,7 +427,7 @@ async def mfa_verify(body: MFAVerifyRequest):
 
     now = get_current_time()
     if clear_expired_mfa_lock(user, now):
-        await user.save()
+        await _save_user(user)
     if user.is_mfa_locked(now):
         secs = mfa_retry_after_seconds(user, now)
         raise HTTPException(
@@ -434,7 +450,7 @@ async def mfa_verify(body: MFAVerifyRequest):
 
     if not verify_totp_code(secret, body.code):
         just_locked = record_failed_mfa(user)
-        await user.save()
+        await _save_user(user)
         if just_locked:
             secs = mfa_retry_after_seconds(user, get_current_time())
             raise HTTPException(
@@ -452,7 +468,7 @@ async def mfa_verify(body: MFAVerifyRequest):
 
     reset_mfa_lockout_on_success(user)
     user.last_login = get_current_time()
-    await user.save()
+    await _save_user(user)
 
     return TokenResponse(
         access_token=_access_token_for_user(user),
@@ -474,7 +490,7 @@ async def mfa_setup_start(current_user: User = Depends(get_current_user)):
 
     secret = random_base32_secret()
     current_user.totp_pending_secret_encrypted = encrypt_totp_secret(secret)
-    await current_user.save()
+    await _save_user(current_user)
 
     issuer = settings.TOTP_ISSUER
     uri = provisioning_uri(secret, current_user.email, issuer)
@@ -529,7 +545,7 @@ async def mfa_setup_confirm(
     current_user.totp_secret_encrypted = pending
     current_user.totp_pending_secret_encrypted = None
     current_user.totp_enabled = True
-    await current_user.save()
+    await _save_user(current_user)
 
     return {"message": "Two-factor authentication enabled", "totp_enabled": True}
 
@@ -552,7 +568,7 @@ async def mfa_disable(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Password contains invalid characters",
         )
-    if not verify_password(body.password, current_user.hashed_password):
+    if not await asyncio.to_thread(verify_password, body.password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password",
@@ -583,7 +599,7 @@ async def mfa_disable(
     current_user.totp_secret_encrypted = None
     current_user.totp_pending_secret_encrypted = None
     reset_mfa_lockout_on_success(current_user)
-    await current_user.save()
+    await _save_user(current_user)
 
     return {"message": "Two-factor authentication disabled", "totp_enabled": False}
 
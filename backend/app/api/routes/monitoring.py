@@ -1,30 +1,51 @@
 """
 API routes for monitoring and reports
 """
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+from collections import Counter
+import asyncio
+from pydantic import BaseModel
 from app.utils.datetime_utils import get_current_time, format_datetime_server, to_iso_utc
 from app.utils.audit_sanitize import sanitize_extra_data
+from app.utils.ttl_cache import TTLCache
 from app.models_mongo.logs import Log, DetectedEntity
 from app.models_mongo.alerts import Alert
 from app.models_mongo.policies import Policy
-from app.services.mydlp_service import MyDLPService
+from app.services.mydlp_service import get_mydlp_service
 from app.services.email_monitoring_service import EmailMonitoringService
 from app.api.dependencies import get_current_admin, get_optional_user, get_current_user
 
 router = APIRouter(prefix="/api/monitoring", tags=["Monitoring"])
 
 # Initialize services
-# Note: MyDLPService reads config at initialization, so it will use the latest config
-# when the module is loaded. If config changes, server restart is needed.
-mydlp_service = MyDLPService()
+# Note: the shared MyDLPService (get_mydlp_service) reads config on first use; /status
+# refreshes its enabled flag from .env, other config changes need a server restart.
 email_monitoring = EmailMonitoringService()
 
-# Log initial MyDLP status for debugging
 import logging
 logger = logging.getLogger(__name__)
-logger.info(f"MyDLP service initialized - enabled: {mydlp_service.is_enabled()}, API URL: {mydlp_service.api_url}")
+
+
+class _EntityTypeOnly(BaseModel):
+    """Projection used when only the entity type of a DetectedEntity is needed."""
+    entity_type: str
+
+
+# Dashboard reports are polled frequently but change slowly; serve repeats from memory
+REPORT_CACHE_SECONDS = 10
+REPORT_CACHE_MAXSIZE = 256  # keyed on (endpoint, days); days is bounded to 1..365
+_report_cache = TTLCache(ttl_seconds=REPORT_CACHE_SECONDS, maxsize=REPORT_CACHE_MAXSIZE)
+_REPORT_CACHE_CONTROL = f"private, max-age={REPORT_CACHE_SECONDS}"
+
+# Log event types shown under "analysis operations" in user activity views
+_ANALYSIS_EVENTS = frozenset({
+    "analysis",
+    "policy_applied",
+    "file_analyzed",
+    "entities_detected_no_policy_match",
+})
 
 
 async def _policy_names_from_matching_ids(meta: Optional[Dict[str, Any]]) -> List[str]:
@@ -79,10 +100,8 @@ async def get_system_status(
         # Default to True (if empty or any other value)
         mydlp_enabled = True
     
-    # Create MyDLP service
-    current_mydlp = MyDLPService()
-    # Override enabled status with fresh value from env
-    current_mydlp.enabled = mydlp_enabled
+    # Report the env value without changing the process-wide service it describes
+    mydlp_service = get_mydlp_service()
     
     return {
         "status": "operational",
@@ -93,7 +112,7 @@ async def get_system_status(
         "mydlp": {
             "enabled": mydlp_enabled,
             "status": "operational" if mydlp_enabled else "disabled",
-            "is_localhost": current_mydlp.is_local() if mydlp_enabled else False
+            "is_localhost": mydlp_service.is_local() if mydlp_enabled else False
         },
         "timestamp": get_current_time().isoformat()
     }
@@ -110,7 +129,7 @@ async def monitor_traffic(
     This endpoint receives traffic data and uses MyDLP to monitor it
     """
     try:
-        result = mydlp_service.monitor_network_traffic(traffic_data)
+        result = get_mydlp_service().monitor_network_traffic(traffic_data)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error monitoring traffic: {str(e)}")
@@ -118,12 +137,18 @@ async def monitor_traffic(
 
 @router.get("/reports/summary")
 async def get_summary_report(
-    days: int = 7,
+    response: Response,
+    days: int = Query(7, ge=1, le=365),
     current_user = Depends(get_current_admin)  # Admin only
 ):
     """
     Get summary report for the last N days
     """
+    response.headers["Cache-Control"] = _REPORT_CACHE_CONTROL
+    cache_key = ("reports/summary", days)
+    cached = _report_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         start_date = get_current_time() - timedelta(days=days)
         
@@ -144,13 +169,12 @@ async def get_summary_report(
         active_policies = await Policy.find({"enabled": True}).count()
         
         # Entity type breakdown
-        entities = await DetectedEntity.find({"created_at": {"$gte": start_date}}).to_list()
-        entity_type_counts = {}
-        for entity in entities:
-            entity_type = entity.entity_type
-            entity_type_counts[entity_type] = entity_type_counts.get(entity_type, 0) + 1
+        entities = await DetectedEntity.find(
+            {"created_at": {"$gte": start_date}}
+        ).project(_EntityTypeOnly).to_list()
+        entity_type_counts = dict(Counter(e.entity_type for e in entities))
         
-        return {
+        report = {
             "period_days": days,
             "start_date": start_date.isoformat(),
             "end_date": get_current_time().isoformat(),
@@ -163,6 +187,8 @@ async def get_summary_report(
             },
             "entity_type_breakdown": entity_type_counts
         }
+        _report_cache.set(cache_key, report)
+        return report
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
@@ -195,13 +221,13 @@ async def get_logs_report(
         # Calculate pagination
         skip = (page - 1) * limit
         
-        # Get total count
-        if query:
-            total_count = await Log.find(query).count()
-            logs = await Log.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
-        else:
-            total_count = await Log.find({}).count()
-            logs = await Log.find({}).sort("-created_at").skip(skip).limit(limit).to_list()
+        # Total count and current page (an empty query matches all logs).
+        # Not merged into one $facet: its single result document is capped at 16MB,
+        # and email logs can carry multi-MB attachment payloads in extra_data.
+        total_count, logs = await asyncio.gather(
+            Log.find(query).count(),
+            Log.find(query).sort("-created_at").skip(skip).limit(limit).to_list(),
+        )
         
         # Calculate pagination metadata
         total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
@@ -323,7 +349,8 @@ async def monitor_email(
 
 @router.get("/email/statistics")
 async def get_email_statistics(
-    days: int = 7,
+    response: Response,
+    days: int = Query(7, ge=1, le=365),
     current_user = Depends(get_current_admin)  # Admin only
 ):
     """
@@ -331,8 +358,14 @@ async def get_email_statistics(
     
     Returns statistics about emails analyzed, blocked, and detected entities.
     """
+    response.headers["Cache-Control"] = _REPORT_CACHE_CONTROL
+    cache_key = ("email/statistics", days)
+    cached = _report_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         stats = await email_monitoring.get_email_statistics(days=days)
+        _report_cache.set(cache_key, stats)
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting email statistics: {str(e)}")
@@ -579,18 +612,16 @@ async def get_user_activities(
         # Paginated logs
         user_logs = await Log.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
         
-        # Get all detected entities for this user (from files they analyzed)
-        user_entities = await DetectedEntity.find({
-            "created_at": {"$gte": start_date}
-        }).to_list()
-        
-        # Filter entities by checking logs for file operations
+        # Group the page's logs by operation type
         file_operations = []
         network_operations = []
         analysis_operations = []
+        # Sanitized metadata per log, reused for the "all" operations list
+        safe_metas = []
         
         for log in user_logs:
             safe_meta = sanitize_extra_data(log.extra_data) if log.extra_data else {}
+            safe_metas.append(safe_meta)
             operation = {
                 "id": str(log.id),
                 "event_type": log.event_type,
@@ -617,7 +648,7 @@ async def get_user_activities(
                 network_operations.append(operation)
             
             # Analysis operations (from Analysis tab: text analysis, file analysis, policy applied)
-            if log.event_type in ["analysis", "policy_applied", "file_analyzed", "entities_detected_no_policy_match"]:
+            if log.event_type in _ANALYSIS_EVENTS:
                 analysis_operations.append(operation)
         
         # Get unique file names
@@ -692,10 +723,10 @@ async def get_user_activities(
                         "source_user": log.source_user,
                         "file_name": log.file_name,
                         "network_destination": log.network_destination,
-                        "metadata": sanitize_extra_data(log.extra_data) if log.extra_data else {},
+                        "metadata": safe_meta,
                         "policy_names": policy_names_for_log(log)
                     }
-                    for log in user_logs
+                    for log, safe_meta in zip(user_logs, safe_metas)
                 ],
                 "file_operations": file_operations,
                 "network_operations": network_operations,
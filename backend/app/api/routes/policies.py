@@ -2,16 +2,110 @@
 API routes for policy management - MongoDB version
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+from beanie import UpdateResponse
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
 from app.schemas.policies import PolicyCreate, PolicyUpdate, PolicyResponse
-from app.models_mongo.policies import Policy
-from app.services.mydlp_service import MyDLPService
+from app.models_mongo.policies import (
+    Policy,
+    PolicyListProjection,
+    normalize_entity_types,
+    policy_content_hash,
+)
+from app.services.mydlp_service import get_mydlp_service
 from app.api.dependencies import get_current_admin
 from app.utils.datetime_utils import get_current_time
+import asyncio
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/policies", tags=["Policies"])
 
-mydlp_service = MyDLPService()
+
+async def _find_duplicate_policy(
+    entity_types: List[str],
+    action: str,
+    severity: str,
+    exclude_id=None,
+) -> Optional[Policy]:
+    """
+    Return a live policy with the same entity types (in any order), action and severity.
+    
+    A single equality lookup on the indexed content_hash signature.
+    """
+    query: Dict[str, Any] = {
+        "content_hash": policy_content_hash(entity_types, action, severity),
+        "is_deleted": False,
+    }
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    return await Policy.find_one(query)
+
+
+def _duplicate_policy_error(exc: DuplicateKeyError) -> HTTPException:
+    """Translate a unique-index violation on policies into a 400 response."""
+    key_pattern = (exc.details or {}).get("keyPattern") or {}
+    if "content_hash" in key_pattern:
+        detail = "A policy with the same configuration already exists"
+    else:
+        detail = "Policy with this name already exists"
+    return HTTPException(status_code=400, detail=detail)
+
+
+def _policy_object_id(policy_id: str) -> ObjectId:
+    """Parse the path id; a malformed id cannot match any policy, so it is a 404."""
+    try:
+        return ObjectId(policy_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Policy not found")
+
+
+async def _get_live_policy(policy_id: str) -> Policy:
+    """Fetch a non-deleted policy in one filtered query, or raise 404."""
+    policy = await Policy.find_one({"_id": _policy_object_id(policy_id), "is_deleted": False})
+    if policy is None:
+        raise HTTPException(status_code=404, detail="Policy not found")
+    return policy
+
+
+def _policy_to_response(policy) -> PolicyResponse:
+    """Build the API response from a Policy document or PolicyListProjection."""
+    return PolicyResponse.model_validate(policy)
+
+
+def _encode_policy_cursor(policy: PolicyListProjection) -> str:
+    """Opaque keyset cursor pointing just after this policy in (-created_at, -_id) order."""
+    raw = json.dumps({"created_at": policy.created_at.isoformat(), "id": str(policy.id)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_policy_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(data["created_at"]), ObjectId(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _log_mydlp_sync_result(future: "asyncio.Future") -> None:
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.error("MyDLP policy sync failed: %s", exc)
+
+
+def _submit_mydlp_policy_sync(policy_data: Dict[str, Any]) -> None:
+    """Run the blocking MyDLP create_policy call in the default thread pool."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, get_mydlp_service().create_policy, policy_data)
+    future.add_done_callback(_log_mydlp_sync_result)
 
 
 @router.get("/test")
@@ -31,58 +125,36 @@ async def create_policy(
     Prevents duplicate policies (same name or same content).
     """
     try:
-        # Check if policy with same name exists (including soft-deleted)
-        existing = await Policy.find_one({"name": policy.name})
-        if existing and not existing.is_deleted:
-            raise HTTPException(
-                status_code=400, 
-                detail="Policy with this name already exists"
-            )
-        
         # Check for duplicate content (same entity_types, action, and severity)
         # Only check non-deleted policies
-        all_policies = await Policy.find({"is_deleted": False}).to_list()
-        for existing_policy in all_policies:
-            # Check if content is identical
-            if (sorted(existing_policy.entity_types) == sorted(policy.entity_types) and
-                existing_policy.action == policy.action and
-                existing_policy.severity == policy.severity):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"A policy with the same configuration already exists: {existing_policy.name}"
-                )
+        existing_policy = await _find_duplicate_policy(
+            policy.entity_types, policy.action, policy.severity
+        )
+        if existing_policy:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A policy with the same configuration already exists: {existing_policy.name}"
+            )
         
         # Create policy
-        policy_dict = policy.dict()
+        policy_dict = policy.model_dump()
         policy_dict["created_by"] = str(current_user.id) if hasattr(current_user, 'id') else None
         db_policy = Policy(**policy_dict)
-        await db_policy.insert()
+        # Unique indexes on name and content_hash also cover concurrent creates
+        try:
+            await db_policy.insert()
+        except DuplicateKeyError as e:
+            raise _duplicate_policy_error(e)
         
-        # Sync with MyDLP if enabled
-        if mydlp_service.is_enabled():
-            mydlp_service.create_policy({
+        # Sync with MyDLP if enabled (in the background; the response does not wait)
+        if get_mydlp_service().is_enabled():
+            _submit_mydlp_policy_sync({
                 "name": policy.name,
                 "entity_types": policy.entity_types,
                 "action": policy.action
             })
         
-        return PolicyResponse(
-            id=str(db_policy.id),
-            name=db_policy.name,
-            description=db_policy.description,
-            entity_types=db_policy.entity_types,
-            action=db_policy.action,
-            severity=db_policy.severity,
-            enabled=db_policy.enabled,
-            apply_to_network=db_policy.apply_to_network,
-            apply_to_devices=db_policy.apply_to_devices,
-            apply_to_storage=db_policy.apply_to_storage,
-            gdpr_compliant=db_policy.gdpr_compliant,
-            hipaa_compliant=db_policy.hipaa_compliant,
-            created_at=db_policy.created_at,
-            updated_at=db_policy.updated_at,
-            created_by=db_policy.created_by
-        )
+        return _policy_to_response(db_policy)
         
     except HTTPException:
         raise
@@ -95,6 +167,7 @@ async def get_policies(
     enabled: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page (keyset pagination)"),
     current_user = Depends(get_current_admin)  # Admin only
 ):
     """
@@ -107,96 +180,91 @@ async def get_policies(
     - enabled: Filter by enabled status (True/False). If not provided, returns all policies.
     - page: Page number (default: 1)
     - limit: Items per page (default: 10, max: 100)
+    - cursor: Continue after the last item of a previous page instead of skipping by page;
+      page and has_prev are then null and has_next follows next_cursor
     """
-    import logging
-    import traceback
-    logger = logging.getLogger(__name__)
-    
     try:
-        logger.info(f"Fetching policies - enabled filter: {enabled}, page: {page}, limit: {limit}, user: {current_user.username if current_user else 'None'}")
-        
-        # Get all non-deleted policies (including those where is_deleted is null/undefined)
-        # For Beanie, we need to use a different approach - get all and filter in Python
-        # OR use MongoDB query syntax directly
-        # First, try to get all policies and filter
-        base_query = Policy.find({})  # Get all policies first
+        logger.debug(
+            "Fetching policies - enabled filter: %s, page: %s, limit: %s", enabled, page, limit
+        )
         
-        # Only filter by enabled if explicitly provided
+        # Non-deleted policies (matches the live_by_created partial index)
+        query: Dict[str, Any] = {"is_deleted": False}
         if enabled is not None:
-            base_query = Policy.find({"enabled": enabled})
-        
-        # Get all policies and filter out deleted ones in Python
-        # This ensures we get policies even if is_deleted field doesn't exist
-        all_policies = await base_query.to_list()
-        policies_list = [p for p in all_policies if not getattr(p, 'is_deleted', False)]
-        
-        # Sort by created_at descending
-        policies_list = sorted(policies_list, key=lambda x: x.created_at, reverse=True)
-        
-        # Apply pagination manually
-        total_count = len(policies_list)
-        skip = (page - 1) * limit
-        policies = policies_list[skip:skip + limit]
-        
-        logger.info(f"Total policies found: {total_count}, showing {len(policies)} on page {page}")
-        
-        # Convert to result format
-        result = []
-        for p in policies:
-            try:
-                result.append(PolicyResponse(
-                    id=str(p.id),
-                    name=p.name,
-                    description=p.description,
-                    entity_types=p.entity_types,
-                    action=p.action,
-                    severity=p.severity,
-                    enabled=p.enabled,
-                    apply_to_network=p.apply_to_network,
-                    apply_to_devices=p.apply_to_devices,
-                    apply_to_storage=p.apply_to_storage,
-                    gdpr_compliant=p.gdpr_compliant,
-                    hipaa_compliant=p.hipaa_compliant,
-                    created_at=p.created_at,
-                    updated_at=p.updated_at,
-                    created_by=p.created_by
-                ))
-            except Exception as e:
-                logger.error(f"Error processing policy {p.id}: {e}")
-                logger.error(traceback.format_exc())
-                continue
+            query["enabled"] = enabled
+        
+        page_query = dict(query)
+        if cursor:
+            last_created_at, last_id = _decode_policy_cursor(cursor)
+            page_query["$or"] = [
+                {"created_at": {"$lt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$lt": last_id}},
+            ]
+            skip = 0
+        else:
+            skip = (page - 1) * limit
+        
+        # One extra row tells whether anything follows this page
+        total_count, policies = await asyncio.gather(
+            Policy.find(query).count(),
+            Policy.find(page_query)
+            .sort("-created_at", "-_id")
+            .skip(skip)
+            .limit(limit + 1)
+            .project(PolicyListProjection)
+            .to_list(),
+        )
+        has_more = len(policies) > limit
+        policies = policies[:limit]
+        next_cursor = _encode_policy_cursor(policies[-1]) if has_more else None
         
         # Calculate pagination metadata
         total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
         
-        logger.info(f"Returning {len(result)} policies successfully (page {page}/{total_pages})")
-        
-        return {
-            "items": result,
+        response = {
+            "items": [_policy_to_response(p).model_dump() for p in policies],
             "total": total_count,
             "page": page,
             "limit": limit,
             "total_pages": total_pages,
             "has_next": page < total_pages,
-            "has_prev": page > 1
+            "has_prev": page > 1,
+            "next_cursor": next_cursor
         }
+        if cursor:
+            # Page numbers don't apply when walking by cursor
+            response.update(page=None, has_prev=None, has_next=next_cursor is not None)
+        return response
         
-    except HTTPException as http_err:
-        logger.error(f"HTTP error in get_policies: {http_err.status_code} - {http_err.detail}")
+    except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error fetching policies: {e}")
-        logger.error(traceback.format_exc())
-        # Return empty result instead of raising error to prevent frontend crash
-        return {
-            "items": [],
-            "total": 0,
-            "page": page,
-            "limit": limit,
-            "total_pages": 0,
-            "has_next": False,
-            "has_prev": False
-        }
+        logger.exception("Unexpected error fetching policies")
+        raise HTTPException(status_code=500, detail=f"Error fetching policies: {str(e)}")
+
+
+@router.get("/deleted", response_model=List[PolicyResponse])
+async def get_deleted_policies(
+    current_user = Depends(get_current_admin)  # Admin only
+):
+    """
+    Get all deleted policies (Admin only)
+    
+    Returns only soft-deleted policies for restoration purposes.
+    """
+    try:
+        deleted_policies = await Policy.find(
+            {"is_deleted": True}
+        ).sort("-updated_at").project(PolicyListProjection).to_list()
+        
+        result = []
+        for policy in deleted_policies:
+            result.append(_policy_to_response(policy))
+        
+        return result
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching deleted policies: {str(e)}")
 
 
 @router.get("/{policy_id}", response_model=PolicyResponse)
@@ -209,32 +277,8 @@ async def get_policy(
     
     Only returns non-deleted policies.
     """
-    try:
-        policy = await Policy.get(policy_id)
-        if policy.is_deleted:
-            raise HTTPException(status_code=404, detail="Policy not found")
-    except HTTPException:
-        raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Policy not found")
-    
-    return PolicyResponse(
-        id=str(policy.id),
-        name=policy.name,
-        description=policy.description,
-        entity_types=policy.entity_types,
-        action=policy.action,
-        severity=policy.severity,
-        enabled=policy.enabled,
-        apply_to_network=policy.apply_to_network,
-        apply_to_devices=policy.apply_to_devices,
-        apply_to_storage=policy.apply_to_storage,
-        gdpr_compliant=policy.gdpr_compliant,
-        hipaa_compliant=policy.hipaa_compliant,
-        created_at=policy.created_at,
-        updated_at=policy.updated_at,
-        created_by=policy.created_by
-    )
+    policy = await _get_live_policy(policy_id)
+    return _policy_to_response(policy)
 
 
 @router.put("/{policy_id}", response_model=PolicyResponse)
@@ -250,16 +294,13 @@ async def update_policy(
     Prevents duplicate content when updating.
     """
     try:
-        try:
-            policy = await Policy.get(policy_id)
-        except Exception:
-            raise HTTPException(status_code=404, detail="Policy not found")
-        
-        if policy.is_deleted:
-            raise HTTPException(status_code=404, detail="Policy not found (deleted)")
+        policy = await _get_live_policy(policy_id)
         
         # Update fields
-        update_data = policy_update.dict(exclude_unset=True)
+        update_data = policy_update.model_dump(exclude_unset=True)
+        # Nothing actually changes: skip the write and keep updated_at as is
+        if all(getattr(policy, field) == value for field, value in update_data.items()):
+            return _policy_to_response(policy)
         
         # Check for duplicate content if entity_types, action, or severity are being updated
         if any(key in update_data for key in ['entity_types', 'action', 'severity']):
@@ -268,41 +309,33 @@ async def update_policy(
             new_action = update_data.get('action', policy.action)
             new_severity = update_data.get('severity', policy.severity)
             
+            # Same configuration as stored (e.g. the client PUTs the object back): no scan needed
+            unchanged = (
+                normalize_entity_types(new_entity_types) == normalize_entity_types(policy.entity_types)
+                and new_action == policy.action
+                and new_severity == policy.severity
+            )
+            
             # Check for duplicates (excluding current policy)
-            all_policies = await Policy.find({"is_deleted": False}).to_list()
-            for existing_policy in all_policies:
-                if str(existing_policy.id) != policy_id:  # Exclude current policy
-                    if (sorted(existing_policy.entity_types) == sorted(new_entity_types) and
-                        existing_policy.action == new_action and
-                        existing_policy.severity == new_severity):
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"A policy with the same configuration already exists: {existing_policy.name}"
-                        )
+            existing_policy = None if unchanged else await _find_duplicate_policy(
+                new_entity_types, new_action, new_severity, exclude_id=policy.id
+            )
+            if existing_policy:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"A policy with the same configuration already exists: {existing_policy.name}"
+                )
         
         for field, value in update_data.items():
             setattr(policy, field, value)
         
         policy.updated_at = get_current_time()
-        await policy.save()
-        
-        return PolicyResponse(
-            id=str(policy.id),
-            name=policy.name,
-            description=policy.description,
-            entity_types=policy.entity_types,
-            action=policy.action,
-            severity=policy.severity,
-            enabled=policy.enabled,
-            apply_to_network=policy.apply_to_network,
-            apply_to_devices=policy.apply_to_devices,
-            apply_to_storage=policy.apply_to_storage,
-            gdpr_compliant=policy.gdpr_compliant,
-            hipaa_compliant=policy.hipaa_compliant,
-            created_at=policy.created_at,
-            updated_at=policy.updated_at,
-            created_by=policy.created_by
-        )
+        try:
+            await policy.save()
+        except DuplicateKeyError as e:
+            raise _duplicate_policy_error(e)
+
+        return _policy_to_response(policy)
         
     except HTTPException:
         raise
@@ -321,18 +354,15 @@ async def delete_policy(
     Policies cannot be permanently deleted for audit purposes.
     """
     try:
-        try:
-            policy = await Policy.get(policy_id)
-        except Exception:
-            raise HTTPException(status_code=404, detail="Policy not found")
+        oid = _policy_object_id(policy_id)
         
-        if policy.is_deleted:
-            raise HTTPException(status_code=404, detail="Policy already deleted")
-        
-        # Soft delete: mark as deleted instead of actually deleting
-        policy.is_deleted = True
-        policy.updated_at = get_current_time()
-        await policy.save()
+        # Soft delete: mark as deleted instead of actually deleting (one round trip)
+        result = await Policy.find_one({"_id": oid, "is_deleted": False}).update(
+            {"$set": {"is_deleted": True, "updated_at": get_current_time()}}
+        )
+        if not result.matched_count:
+            detail = "Policy already deleted" if await Policy.find_one({"_id": oid}) else "Policy not found"
+            raise HTTPException(status_code=404, detail=detail)
         
         return None
         
@@ -353,76 +383,24 @@ async def restore_policy(
     Restores a previously deleted policy by setting is_deleted to False.
     """
     try:
+        oid = _policy_object_id(policy_id)
+        
+        # Restore policy (one round trip; returns the updated document)
         try:
-            policy = await Policy.get(policy_id)
-        except Exception:
+            policy = await Policy.find_one({"_id": oid, "is_deleted": True}).update(
+                {"$set": {"is_deleted": False, "updated_at": get_current_time()}},
+                response_type=UpdateResponse.NEW_DOCUMENT,
+            )
+        except DuplicateKeyError as e:
+            raise _duplicate_policy_error(e)
+        if policy is None:
+            if await Policy.find_one({"_id": oid}):
+                raise HTTPException(status_code=400, detail="Policy is not deleted")
             raise HTTPException(status_code=404, detail="Policy not found")
         
-        if not policy.is_deleted:
-            raise HTTPException(status_code=400, detail="Policy is not deleted")
-        
-        # Restore policy
-        policy.is_deleted = False
-        policy.updated_at = get_current_time()
-        await policy.save()
-        
-        return PolicyResponse(
-            id=str(policy.id),
-            name=policy.name,
-            description=policy.description,
-            entity_types=policy.entity_types,
-            action=policy.action,
-            severity=policy.severity,
-            enabled=policy.enabled,
-            apply_to_network=policy.apply_to_network,
-            apply_to_devices=policy.apply_to_devices,
-            apply_to_storage=policy.apply_to_storage,
-            gdpr_compliant=policy.gdpr_compliant,
-            hipaa_compliant=policy.hipaa_compliant,
-            created_at=policy.created_at,
-            updated_at=policy.updated_at,
-            created_by=policy.created_by
-        )
+        return _policy_to_response(policy)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error restoring policy: {str(e)}")
-
-
-@router.get("/deleted", response_model=List[PolicyResponse])
-async def get_deleted_policies(
-    current_user = Depends(get_current_admin)  # Admin only
-):
-    """
-    Get all deleted policies (Admin only)
-    
-    Returns only soft-deleted policies for restoration purposes.
-    """
-    try:
-        deleted_policies = await Policy.find({"is_deleted": True}).sort("-updated_at").to_list()
-        
-        result = []
-        for policy in deleted_policies:
-            result.append(PolicyResponse(
-                id=str(policy.id),
-                name=policy.name,
-                description=policy.description,
-                entity_types=policy.entity_types,
-                action=policy.action,
-                severity=policy.severity,
-                enabled=policy.enabled,
-                apply_to_network=policy.apply_to_network,
-                apply_to_devices=policy.apply_to_devices,
-                apply_to_storage=policy.apply_to_storage,
-                gdpr_compliant=policy.gdpr_compliant,
-                hipaa_compliant=policy.hipaa_compliant,
-                created_at=policy.created_at,
-                updated_at=policy.updated_at,
-                created_by=policy.created_by
-            ))
-        
-        return result
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching deleted policies: {str(e)}")
@@ -1,8 +1,12 @@
 """
 Test-only seed endpoint for E2E tests
 ONLY available when ENVIRONMENT=test
+
+Handlers are plain `def` because the SQL session is synchronous; FastAPI runs
+them in its threadpool instead of blocking the event loop.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 import os
@@ -24,7 +28,7 @@ def check_test_environment():
 
 
 @router.post("/seed-users", status_code=status.HTTP_201_CREATED)
-async def seed_test_users(db: Session = Depends(get_db)):
+def seed_test_users(db: Session = Depends(get_db)):
     """
     Seed test users for E2E testing
     Creates admin_test and user_test accounts (idempotent)
@@ -53,47 +57,57 @@ async def seed_test_users(db: Session = Depends(get_db)):
     
     created_users = []
     
+    # One query for every seeded username/email, then bulk insert/update
+    existing_users = db.query(User).filter(
+        or_(
+            User.username.in_([u["username"] for u in test_users]),
+            User.email.in_([u["email"] for u in test_users])
+        )
+    ).all()
+    existing_by_username = {u.username: u for u in existing_users}
+    existing_by_email = {u.email: u for u in existing_users}
+    
+    inserts = []
+    updates = []
+    approved_at = datetime.utcnow()
     for user_data in test_users:
-        # Check if user exists
-        existing = db.query(User).filter(
-            (User.username == user_data["username"]) | 
-            (User.email == user_data["email"])
-        ).first()
+        existing = (
+            existing_by_username.get(user_data["username"])
+            or existing_by_email.get(user_data["email"])
+        )
+        values = {
+            "hashed_password": get_password_hash(user_data["password"]),
+            "role": user_data["role"],
+            "status": user_data["status"],
+            "is_active": user_data["is_active"],
+            "approved_at": approved_at
+        }
         
         if existing:
             # Update existing user
-            existing.hashed_password = get_password_hash(user_data["password"])
-            existing.role = user_data["role"]
-            existing.status = user_data["status"]
-            existing.is_active = user_data["is_active"]
-            existing.approved_at = datetime.utcnow()
-            created_users.append({
-                "username": existing.username,
-                "email": existing.email,
-                "role": existing.role.value,
-                "status": existing.status.value,
-                "action": "updated"
-            })
+            updates.append({"id": existing.id, **values})
+            username, email, action = existing.username, existing.email, "updated"
         else:
             # Create new user
-            new_user = User(
-                username=user_data["username"],
-                email=user_data["email"],
-                hashed_password=get_password_hash(user_data["password"]),
-                role=user_data["role"],
-                status=user_data["status"],
-                is_active=user_data["is_active"],
-                approved_at=datetime.utcnow()
-            )
-            db.add(new_user)
-            created_users.append({
-                "username": new_user.username,
-                "email": new_user.email,
-                "role": new_user.role.value,
-                "status": new_user.status.value,
-                "action": "created"
+            inserts.append({
+                "username": user_data["username"],
+                "email": user_data["email"],
+                **values
             })
+            username, email, action = user_data["username"], user_data["email"], "created"
+        
+        created_users.append({
+            "username": username,
+            "email": email,
+            "role": user_data["role"].value,
+            "status": user_data["status"].value,
+            "action": action
+        })
     
+    if inserts:
+        db.bulk_insert_mappings(User, inserts)
+    if updates:
+        db.bulk_update_mappings(User, updates)
     db.commit()
     
     return {
@@ -103,7 +117,7 @@ async def seed_test_users(db: Session = Depends(get_db)):
 
 
 @router.delete("/cleanup", status_code=status.HTTP_200_OK)
-async def cleanup_test_users(db: Session = Depends(get_db)):
+def cleanup_test_users(db: Session = Depends(get_db)):
     """
     Cleanup test users (optional, for test isolation)
     ONLY available when ENVIRONMENT=test
@@ -111,13 +125,11 @@ async def cleanup_test_users(db: Session = Depends(get_db)):
     check_test_environment()
     
     test_usernames = ["admin_test", "user_test"]
-    deleted_count = 0
     
-    for username in test_usernames:
-        user = db.query(User).filter(User.username == username).first()
-        if user:
-            db.delete(user)
-            deleted_count += 1
+    # Single DELETE ... WHERE username IN (...)
+    deleted_count = db.query(User).filter(
+        User.username.in_(test_usernames)
+    ).delete(synchronize_session=False)
     
     db.commit()
     
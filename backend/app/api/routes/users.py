@@ -2,11 +2,16 @@
 API routes for user management (Admin only) - MongoDB version
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from beanie import PydanticObjectId
+import asyncio
+import logging
+import re
+from beanie import PydanticObjectId, UpdateResponse
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.utils.datetime_utils import get_current_time
-from app.models_mongo.users import User, UserRole, UserStatus
+from app.models_mongo.users import User, UserListProjection, UserRole, UserStatus
 from app.schemas.users import (
     UserResponse, UserDetailResponse, UserCreate, UserUpdate,
     ApproveUserRequest, RejectUserRequest,
@@ -14,17 +19,66 @@ from app.schemas.users import (
 )
 from app.models_mongo.policies import Policy
 from app.services.auth_service import get_password_hash
-from app.api.dependencies import get_current_admin, get_current_admin_or_manager
+from app.api.dependencies import get_current_admin, get_current_admin_or_manager, invalidate_cached_user
 from app.models_mongo.departments import Department
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Stored enum values used in query documents
+_PENDING = UserStatus.PENDING.value
+_APPROVED = UserStatus.APPROVED.value
+_REJECTED = UserStatus.REJECTED.value
+_ACTIVE = UserStatus.ACTIVE.value
+_ADMIN = UserRole.ADMIN.value
+_REGULAR = UserRole.REGULAR.value
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
+# Absorbs admin-dashboard polling; writes in this module clear it. Self-registrations
+# (auth router) show up once the entry expires.
+USER_STATS_CACHE_SECONDS = 5
+_user_stats_cache = TTLCache(ttl_seconds=USER_STATS_CACHE_SECONDS)
+_user_stats_lock = asyncio.Lock()
+
+
+def _count_if(condition: Dict[str, Any]) -> Dict[str, Any]:
+    """$group accumulator counting documents that match an aggregation expression."""
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def _duplicate_user_error(exc: DuplicateKeyError) -> HTTPException:
+    """Translate a unique-index violation on users into the matching 400 response."""
+    key_pattern = (exc.details or {}).get("keyPattern") or {}
+    if "email" in key_pattern:
+        detail = "Email already exists"
+    elif "username" in key_pattern:
+        detail = "Username already exists"
+    else:
+        detail = "Username or email already exists"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _search_filter(search: str) -> Dict[str, Any]:
+    """Case-insensitive substring match on username or email, evaluated by MongoDB."""
+    pattern = {"$regex": re.escape(search), "$options": "i"}
+    return {"$or": [{"username": pattern}, {"email": pattern}]}
+
+
+def _user_object_id(user_id: str) -> ObjectId:
+    """Parse the path id before any query; malformed ids never reach MongoDB."""
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user id",
+        )
+    return ObjectId(user_id)
+
 
 async def _get_user_for_admin_or_manager(user_id: str, current_user: User) -> User:
     """Load user by id or 404; apply manager department scope (same as get_user)."""
-    try:
-        user = await User.get(user_id)
-    except Exception:
+    user = await User.get(_user_object_id(user_id))
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
@@ -38,18 +92,43 @@ async def _get_user_for_admin_or_manager(user_id: str, current_user: User) -> Us
     return user
 
 
-async def _user_to_detail_response(user: User) -> UserDetailResponse:
-    """Build UserDetailResponse with department_name from department_id."""
-    department_name = None
-    if getattr(user, "department_id", None):
-        try:
-            dept = await Department.get(user.department_id)
-            if dept:
-                department_name = dept.name
-        except Exception:
-            pass
-    return UserDetailResponse(
-        id=str(user.id),
+def _user_scope(user_id: str, current_user: User) -> Dict[str, Any]:
+    """Filter for the target user as seen by current_user (managers: own department only)."""
+    scope: Dict[str, Any] = {"_id": _user_object_id(user_id)}
+    if current_user.role == UserRole.MANAGER:
+        scope["department_id"] = getattr(current_user, "department_id", None)
+    return scope
+
+
+async def _transition_pending_user(user_id: str, current_user: User, changes: Dict[str, Any]) -> User:
+    """
+    Atomically apply changes to a pending user (one find-and-update) and return it.
+    
+    Two admins acting on the same request cannot both succeed. On a miss the user
+    is looked up once to tell 404 (unknown / other department) from 400 (not pending).
+    """
+    scope = _user_scope(user_id, current_user)
+    user = await User.find_one({**scope, "status": _PENDING}).update(
+        {"$set": changes},
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    if user is None:
+        existing = await User.find_one(scope)
+        if existing is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"User is not pending. Current status: {existing.status.value}"
+        )
+    _user_stats_cache.clear()
+    invalidate_cached_user(user.id)
+    return user
+
+
+def _to_detail(user: Union[User, UserListProjection], department_name: Optional[str]) -> UserDetailResponse:
+    """Build UserDetailResponse without re-validating fields that came from a typed document."""
+    return UserDetailResponse.model_construct(
+        id=str(user.id),  # model_construct skips the id validator, so convert here
         username=user.username,
         email=user.email,
         role=user.role,
@@ -58,7 +137,7 @@ async def _user_to_detail_response(user: User) -> UserDetailResponse:
         created_at=user.created_at,
         approved_at=user.approved_at,
         last_login=user.last_login,
-        approved_by=str(user.approved_by) if user.approved_by else None,
+        approved_by=user.approved_by,
         rejection_reason=user.rejection_reason,
         department_id=getattr(user, "department_id", None),
         department_name=department_name,
@@ -66,6 +145,33 @@ async def _user_to_detail_response(user: User) -> UserDetailResponse:
     )
 
 
+async def _user_to_detail_response(user: Union[User, UserListProjection]) -> UserDetailResponse:
+    """Build UserDetailResponse with department_name from department_id."""
+    department_name = None
+    if getattr(user, "department_id", None):
+        try:
+            dept = await Department.get(user.department_id)
+            if dept:
+                department_name = dept.name
+        except Exception:
+            pass
+    return _to_detail(user, department_name)
+
+
+async def _users_to_details(users: List[UserListProjection]) -> List[UserDetailResponse]:
+    """Convert a page of users, resolving all their department names in one query."""
+    department_ids = {
+        ObjectId(u.department_id)
+        for u in users
+        if u.department_id and ObjectId.is_valid(u.department_id)
+    }
+    department_names: Dict[str, str] = {}
+    if department_ids:
+        departments = await Department.find({"_id": {"$in": list(department_ids)}}).to_list()
+        department_names = {str(d.id): d.name for d in departments}
+    return [_to_detail(u, department_names.get(u.department_id or "")) for u in users]
+
+
 @router.get("/", response_model=Dict[str, Any])
 async def get_users(
     status_filter: Optional[UserStatus] = Query(None, alias="status"),
@@ -93,82 +199,32 @@ async def get_users(
         base_department_filter = {"department_id": current_user.department_id}
     else:
         base_department_filter = {}
-    # Handle active users filter specially (needs is_active=True)
+    query: Dict[str, Any] = {**base_department_filter}
     if status_filter:
-        status_value = status_filter.value if hasattr(status_filter, 'value') else status_filter
-        if status_value == 'active':
+        if status_filter == UserStatus.ACTIVE:
             # For active users: (status=approved OR status=active) AND is_active=True
-            all_users = await User.find(base_department_filter).sort("-created_at").to_list()
-            filtered_users = [
-                u for u in all_users
-                if u.is_active and (u.status == UserStatus.APPROVED or u.status == UserStatus.ACTIVE)
-            ]
-            # Apply role filter if provided
-            if role_filter:
-                role_value = role_filter.value if hasattr(role_filter, 'value') else role_filter
-                filtered_users = [u for u in filtered_users if u.role.value == role_value]
-            # Apply search filter if provided
-            if search:
-                search_lower = search.lower()
-                filtered_users = [
-                    u for u in filtered_users
-                    if search_lower in u.username.lower() or search_lower in u.email.lower()
-                ]
-            # Calculate pagination
-            total_count = len(filtered_users)
-            skip = (page - 1) * limit
-            users_list = filtered_users[skip:skip + limit]
+            query["is_active"] = True
+            query["status"] = {"$in": [_APPROVED, _ACTIVE]}
         else:
             # Regular status filter
-            query = {"status": status_value, **base_department_filter}
-            if role_filter:
-                role_value = role_filter.value if hasattr(role_filter, 'value') else role_filter
-                query["role"] = role_value
-            base_query = User.find(query)
-            # Calculate pagination
-            skip = (page - 1) * limit
-            # Get total count
-            total_count = await base_query.count()
-            # Apply search filter if provided (before pagination)
-            if search:
-                search_lower = search.lower()
-                all_users = await base_query.sort("-created_at").to_list()
-                filtered_users = [
-                    u for u in all_users
-                    if search_lower in u.username.lower() or search_lower in u.email.lower()
-                ]
-                total_count = len(filtered_users)
-                users_list = filtered_users[skip:skip + limit]
-            else:
-                users_list = await base_query.sort("-created_at").skip(skip).limit(limit).to_list()
-    else:
-        # No status filter
-        query = {**base_department_filter}
-        if role_filter:
-            role_value = role_filter.value if hasattr(role_filter, 'value') else role_filter
-            query["role"] = role_value
-        base_query = User.find(query) if query else User.find({})
-        # Calculate pagination
-        skip = (page - 1) * limit
-        # Get total count
-        total_count = await base_query.count()
-        # Apply search filter if provided (before pagination)
-        if search:
-            search_lower = search.lower()
-            all_users = await base_query.sort("-created_at").to_list()
-            filtered_users = [
-                u for u in all_users
-                if search_lower in u.username.lower() or search_lower in u.email.lower()
-            ]
-            total_count = len(filtered_users)
-            users_list = filtered_users[skip:skip + limit]
-        else:
-            users_list = await base_query.sort("-created_at").skip(skip).limit(limit).to_list()
+            query["status"] = status_filter.value
+    if role_filter:
+        query["role"] = role_filter.value
+    # Apply search filter if provided (in the query, before pagination)
+    if search:
+        query.update(_search_filter(search))
+    
+    # Calculate pagination
+    skip = (page - 1) * limit
+    # Total count and page are independent; run them concurrently
+    total_count, users_list = await asyncio.gather(
+        # Unfiltered total comes from collection metadata instead of a count scan
+        User.find(query).count() if query else User.get_motor_collection().estimated_document_count(),
+        User.find(query).sort("-created_at").skip(skip).limit(limit).project(UserListProjection).to_list(),
+    )
     
-    # Convert to response format
-    result = []
-    for user in users_list:
-        result.append(await _user_to_detail_response(user))
+    # Convert to response format (department lookups overlap)
+    result = await _users_to_details(users_list)
     
     # Calculate pagination metadata
     total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
@@ -186,25 +242,28 @@ async def get_users(
 
 @router.get("/pending", response_model=List[UserDetailResponse])
 async def get_pending_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=500),
     current_user: User = Depends(get_current_admin_or_manager)
 ):
     """
-    Get all pending users waiting for approval (Admin: all; Manager: same department only).
+    Get pending users waiting for approval, oldest first (Admin: all; Manager: same department only).
+    
+    Returns a plain list (capped by limit) so existing clients keep working.
     """
-    query = {"status": UserStatus.PENDING.value}
+    query = {"status": _PENDING}
     if current_user.role == UserRole.MANAGER and getattr(current_user, "department_id", None):
         query["department_id"] = current_user.department_id
     elif current_user.role == UserRole.MANAGER:
         return []
     
-    pending_users = await User.find(query).sort("created_at").to_list()
-    
-    # Convert to response format
-    result = []
-    for user in pending_users:
-        result.append(await _user_to_detail_response(user))
+    # Only the response fields (no password hash / TOTP secrets) leave MongoDB
+    pending_users = await (
+        User.find(query).sort("created_at").skip(skip).limit(limit).project(UserListProjection).to_list()
+    )
     
-    return result
+    # Convert to response format (department lookups overlap)
+    return await _users_to_details(pending_users)
 
 
 @router.get("/{user_id}", response_model=UserDetailResponse)
@@ -215,19 +274,7 @@ async def get_user(
     """
     Get user by ID (Admin: any; Manager: only users in same department).
     """
-    try:
-        user = await User.get(user_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+    user = await _get_user_for_admin_or_manager(user_id, current_user)
     
     return await _user_to_detail_response(user)
 
@@ -271,9 +318,6 @@ async def update_user_policy_assignments(
     """
     Set explicit policy IDs for this user. Empty list means no policies apply to this user.
     """
-    import logging
-    log = logging.getLogger(__name__)
-
     user = await _get_user_for_admin_or_manager(user_id, current_user)
     seen = set()
     unique_ids: List[str] = []
@@ -297,9 +341,9 @@ async def update_user_policy_assignments(
                 detail=f"Policy not found or deleted: {pid}",
             )
 
-    user.assigned_policy_ids = unique_ids
-    await user.save()
-    log.info(
+    await user.set({User.assigned_policy_ids: unique_ids})
+    invalidate_cached_user(user.id)
+    logger.info(
         "User policy assignments updated by %s for user %s (%d policies)",
         current_user.username,
         user.username,
@@ -356,22 +400,6 @@ async def create_user(
     else:
         department_id = getattr(user_data, "department_id", None)
         role = getattr(user_data, "role", None) or UserRole.REGULAR
-    # Check if username exists
-    existing = await User.find_one({"username": user_data.username})
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
-        )
-    
-    # Check if email exists
-    existing_email = await User.find_one({"email": user_data.email})
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists"
-        )
-    
     # Validate department_id if provided
     if department_id:
         try:
@@ -390,7 +418,8 @@ async def create_user(
             )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    # bcrypt is CPU-bound; hash in a worker thread so the event loop keeps serving
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -403,7 +432,12 @@ async def create_user(
         department_id=department_id,
     )
     
-    await new_user.insert()
+    # Username/email uniqueness is enforced by the unique indexes
+    try:
+        await new_user.insert()
+        _user_stats_cache.clear()
+    except DuplicateKeyError as e:
+        raise _duplicate_user_error(e)
     
     return await _user_to_detail_response(new_user)
 
@@ -417,51 +451,27 @@ async def update_user(
     """
     Update user (Admin: any; Manager: only same department, cannot set role to admin).
     """
-    try:
-        user = await User.get(user_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    user = await _get_user_for_admin_or_manager(user_id, current_user)
     if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
         if user_data.role is not None and user_data.role == UserRole.ADMIN:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot set user role to admin"
             )
     
-    # Update fields
+    # Collect changed fields; written with a single $set
+    changes: Dict[str, Any] = {}
     if user_data.username is not None:
-        # Check if new username is taken
-        existing = await User.find_one({"username": user_data.username})
-        if existing and str(existing.id) != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already exists"
-            )
-        user.username = user_data.username
+        changes["username"] = user_data.username
     
     if user_data.email is not None:
-        # Check if new email is taken
-        existing = await User.find_one({"email": user_data.email})
-        if existing and str(existing.id) != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists"
-            )
-        user.email = user_data.email
+        changes["email"] = user_data.email
     
     if user_data.password is not None:
-        user.hashed_password = get_password_hash(user_data.password)
+        changes["hashed_password"] = await asyncio.to_thread(get_password_hash, user_data.password)
     
     if user_data.role is not None:
-        user.role = user_data.role
+        changes["role"] = user_data.role
     
     if user_data.department_id is not None:
         if current_user.role == UserRole.MANAGER and user_data.department_id != current_user.department_id:
@@ -476,7 +486,7 @@ async def update_user(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid department"
                 )
-            user.department_id = user_data.department_id
+            changes["department_id"] = user_data.department_id
         except HTTPException:
             raise
         except Exception:
@@ -486,20 +496,31 @@ async def update_user(
             )
     
     if user_data.status is not None:
-        user.status = user_data.status
+        changes["status"] = user_data.status
         # Auto-activate if approved
         if user_data.status in [UserStatus.APPROVED, UserStatus.ACTIVE]:
-            user.is_active = True
+            changes["is_active"] = True
             if not user.approved_at:
-                user.approved_at = get_current_time()
-                user.approved_by = str(current_user.id)
+                changes["approved_at"] = get_current_time()
+                changes["approved_by"] = str(current_user.id)
         else:
-            user.is_active = False
+            changes["is_active"] = False
     
     if user_data.is_active is not None:
-        user.is_active = user_data.is_active
+        changes["is_active"] = user_data.is_active
     
-    await user.save()
+    # Drop values the user already has; an unchanged username/email is then
+    # never rewritten, so only real changes can hit the unique indexes
+    changes = {field: value for field, value in changes.items() if getattr(user, field, None) != value}
+    
+    # A taken username/email surfaces as a unique-index violation
+    if changes:
+        try:
+            await user.set(changes)
+            _user_stats_cache.clear()
+            invalidate_cached_user(user.id)
+        except DuplicateKeyError as e:
+            raise _duplicate_user_error(e)
     
     return await _user_to_detail_response(user)
 
@@ -513,41 +534,15 @@ async def approve_user(
     """
     Approve a pending user (Admin: any; Manager: same department only).
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        logger.info(f"Approving user {user_id} by {current_user.username}")
-        user = await User.get(user_id)
-    except Exception as e:
-        logger.error(f"User not found: {user_id}, error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    if user.status != UserStatus.PENDING:
-        logger.warning(f"User {user_id} is not pending. Current status: {user.status.value}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"User is not pending. Current status: {user.status.value}"
-        )
-    
-    # Approve user
-    user.status = UserStatus.APPROVED
-    user.is_active = True
-    user.approved_at = get_current_time()
-    user.approved_by = str(current_user.id)
-    user.rejection_reason = None  # Clear any previous rejection reason
-    
-    await user.save()
-    logger.info(f"User {user_id} approved successfully by {current_user.username}")
+    logger.info("Approving user %s by %s", user_id, current_user.username)
+    user = await _transition_pending_user(user_id, current_user, {
+        "status": _APPROVED,
+        "is_active": True,
+        "approved_at": get_current_time(),
+        "approved_by": str(current_user.id),
+        "rejection_reason": None,  # Clear any previous rejection reason
+    })
+    logger.info("User %s approved successfully by %s", user_id, current_user.username)
     
     return await _user_to_detail_response(user)
 
@@ -561,33 +556,12 @@ async def reject_user(
     """
     Reject a pending user (Admin: any; Manager: same department only).
     """
-    try:
-        user = await User.get(user_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    if user.status != UserStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"User is not pending. Current status: {user.status.value}"
-        )
-    
-    # Reject user
-    user.status = UserStatus.REJECTED
-    user.is_active = False
-    user.rejection_reason = request.reason
-    user.approved_by = str(current_user.id)
-    
-    await user.save()
+    user = await _transition_pending_user(user_id, current_user, {
+        "status": _REJECTED,
+        "is_active": False,
+        "rejection_reason": request.reason,
+        "approved_by": str(current_user.id),
+    })
     
     return await _user_to_detail_response(user)
 
@@ -607,23 +581,15 @@ async def suspend_user(
             detail="Cannot suspend your own account"
         )
     
-    try:
-        user = await User.get(user_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    # Suspend user
-    user.is_active = False
-    await user.save()
+    # Suspend user (one find-and-update within the caller's scope)
+    user = await User.find_one(_user_scope(user_id, current_user)).update(
+        {"$set": {"is_active": False}},
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    _user_stats_cache.clear()
+    invalidate_cached_user(user.id)
     
     return await _user_to_detail_response(user)
 
@@ -636,32 +602,22 @@ async def activate_user(
     """
     Activate a suspended user (Admin: any; Manager: same department only).
     """
-    try:
-        user = await User.get(user_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    # Check if user is approved
-    if user.status not in [UserStatus.APPROVED, UserStatus.ACTIVE]:
+    # Activate user; only approved/active users qualify and both end up ACTIVE
+    scope = _user_scope(user_id, current_user)
+    user = await User.find_one({**scope, "status": {"$in": [_APPROVED, _ACTIVE]}}).update(
+        {"$set": {"is_active": True, "status": _ACTIVE}},
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    if user is None:
+        existing = await User.find_one(scope)
+        if existing is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot activate user with status: {user.status.value}. User must be approved first."
+            detail=f"Cannot activate user with status: {existing.status.value}. User must be approved first."
         )
-    
-    # Activate user
-    user.is_active = True
-    if user.status == UserStatus.APPROVED:
-        user.status = UserStatus.ACTIVE
-    await user.save()
+    _user_stats_cache.clear()
+    invalidate_cached_user(user.id)
     
     return await _user_to_detail_response(user)
 
@@ -681,44 +637,61 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    try:
-        user = await User.get(user_id)
-    except Exception:
+    # One delete filtered by id (and department for managers); nothing deleted means 404
+    result = await User.get_motor_collection().delete_one(_user_scope(user_id, current_user))
+    if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    if current_user.role == UserRole.MANAGER:
-        if getattr(user, "department_id", None) != getattr(current_user, "department_id", None):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    await user.delete()
+    _user_stats_cache.clear()
+    invalidate_cached_user(user_id)
     
     return None
 
 
+async def _compute_user_stats() -> Dict[str, int]:
+    """All six counters in a single pass over the users collection."""
+    rows = await User.aggregate([
+        {"$group": {
+            "_id": None,
+            "total_users": {"$sum": 1},
+            "pending_users": _count_if({"$eq": ["$status", _PENDING]}),
+            "approved_users": _count_if({"$eq": ["$status", _APPROVED]}),
+            "active_users": _count_if({"$eq": ["$is_active", True]}),
+            "admin_users": _count_if({"$eq": ["$role", _ADMIN]}),
+            "regular_users": _count_if({"$eq": ["$role", _REGULAR]}),
+        }}
+    ]).to_list()
+    counts = rows[0] if rows else {}
+    
+    return {
+        "total_users": counts.get("total_users", 0),
+        "pending_users": counts.get("pending_users", 0),
+        "approved_users": counts.get("approved_users", 0),
+        "active_users": counts.get("active_users", 0),
+        "admin_users": counts.get("admin_users", 0),
+        "regular_users": counts.get("regular_users", 0)
+    }
+
+
 @router.get("/stats/summary")
 async def get_user_stats(
     current_user: User = Depends(get_current_admin)
 ):
     """
     Get user statistics (Admin only)
-    """
-    total_users = await User.find({}).count()
-    pending_users = await User.find({"status": UserStatus.PENDING.value}).count()
-    approved_users = await User.find({"status": UserStatus.APPROVED.value}).count()
-    active_users = await User.find({"is_active": True}).count()
-    admin_users = await User.find({"role": UserRole.ADMIN.value}).count()
-    regular_users = await User.find({"role": UserRole.REGULAR.value}).count()
     
-    return {
-        "total_users": total_users,
-        "pending_users": pending_users,
-        "approved_users": approved_users,
-        "active_users": active_users,
-        "admin_users": admin_users,
-        "regular_users": regular_users
-    }
+    Cached for USER_STATS_CACHE_SECONDS; user writes through this API clear the cache.
+    """
+    cached = _user_stats_cache.get("summary")
+    if cached is not None:
+        return cached
+    
+    # Concurrent misses (several dashboard tabs) share one aggregation
+    async with _user_stats_lock:
+        cached = _user_stats_cache.get("summary")
+        if cached is None:
+            cached = await _compute_user_stats()
+            _user_stats_cache.set("summary", cached)
+    return cached
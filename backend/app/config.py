@@ -1,11 +1,12 @@
 """
 Configuration settings for the application
 """
+from functools import lru_cache
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import List
 import os
 from dotenv import load_dotenv
-import os
 
 # Load .env file from backend directory
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
@@ -30,6 +31,12 @@ class Settings(BaseSettings):
         "MONGODB_DB_NAME",
         "Secure_db"
     )
+    # Connection pool and wire compression (drivers negotiate the first compressor the server supports)
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib")
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+    MONGODB_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "20000"))
     
     # Database - SQL (Legacy - للتوافق مع الكود القديم)
     DATABASE_URL: str = os.getenv(
@@ -52,13 +59,8 @@ class Settings(BaseSettings):
     
     # MyDLP
     # Force enable MyDLP by default - can be overridden by environment variable
-    # Default to True if not explicitly set to False
-    _mydlp_env = os.getenv("MYDLP_ENABLED", "").strip().lower()
-    if _mydlp_env in ("false", "0", "no", "off"):
-        MYDLP_ENABLED: bool = False
-    else:
-        # Default to True (if empty or any other value)
-        MYDLP_ENABLED: bool = True
+    # Default to True if not explicitly set to False (see parse_mydlp_enabled)
+    MYDLP_ENABLED: bool = True
     MYDLP_API_URL: str = os.getenv("MYDLP_API_URL", "http://localhost:8080")
     MYDLP_API_KEY: str = os.getenv("MYDLP_API_KEY", "")
     
@@ -85,10 +87,24 @@ class Settings(BaseSettings):
         os.getenv("EMAIL_ATTACHMENT_MAX_STORE_BYTES", str(5 * 1024 * 1024))
     )
     
+    @field_validator("MYDLP_ENABLED", mode="before")
+    @classmethod
+    def parse_mydlp_enabled(cls, v):
+        """Only an explicit false/0/no/off disables MyDLP; empty or any other value enables it"""
+        if isinstance(v, str):
+            return v.strip().lower() not in ("false", "0", "no", "off")
+        return v
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings are read from the environment once per process"""
+    return Settings()
+
+
+settings = get_settings()
 
@@ -7,6 +7,8 @@ from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
 # Create database engine with connection pooling for PostgreSQL
+# pool_recycle replaces connections before server-side idle timeouts drop them;
+# pool_use_lifo reuses the most recently returned (warm) connection first
 database_url = settings.DATABASE_URL
 
 engine = create_engine(
@@ -14,6 +16,10 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
+    pool_recycle=1800,
+    pool_use_lifo=True,
+    pool_timeout=10,
+    query_cache_size=1200,  # compiled-statement LRU (SQLAlchemy 1.4+), default is 500
     echo=False
 )
 
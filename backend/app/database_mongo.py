@@ -14,6 +14,18 @@ client: AsyncIOMotorClient = None
 database = None
 _initialized = False
 
+# Documents per bulk_write in the startup backfills
+BACKFILL_BATCH_SIZE = 500
+
+# Policy.name max_length; names renamed by the startup de-duplication stay within it
+POLICY_NAME_MAX_LENGTH = 255
+
+# (field, unique index declared on User, non-unique index it replaces)
+USER_UNIQUE_INDEXES = (
+    ("username", "username_unique", "username_1"),
+    ("email", "email_unique", "email_1"),
+)
+
 
 async def init_mongodb():
     """
@@ -29,10 +41,18 @@ async def init_mongodb():
         logger.info(f"Initializing MongoDB connection to {settings.MONGODB_URL}...")
         
         # Create MongoDB client with longer timeout
+        # minPoolSize keeps connections warm; compressors shrink list responses on the wire
+        # (zstd/snappy need the zstandard/python-snappy packages, zlib is always available);
+        # maxIdleTimeMS retires idle sockets, socketTimeoutMS bounds a stuck query
         client = AsyncIOMotorClient(
             settings.MONGODB_URL,
             serverSelectionTimeoutMS=5000,  # 5 seconds
-            connectTimeoutMS=5000
+            connectTimeoutMS=5000,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+            socketTimeoutMS=settings.MONGODB_SOCKET_TIMEOUT_MS,
+            compressors=settings.MONGODB_COMPRESSORS
         )
         
         # Test connection first (with timeout)
@@ -52,6 +72,15 @@ async def init_mongodb():
         # Import all models BEFORE init_beanie
         from app.models_mongo import users, policies, alerts, logs, departments
         
+        # Bring old policy documents up to date before init_beanie builds the
+        # partial unique indexes that depend on these fields
+        policies_collection = database[policies.Policy.Settings.name]
+        await _backfill_policy_soft_delete_flag(policies_collection)
+        await _backfill_policy_content_hash(policies_collection)
+        await _dedupe_live_policy_names(policies_collection)
+        # Old username/email indexes would block the unique ones declared on User
+        await _prepare_user_unique_indexes(database[users.User.Settings.name])
+        
         logger.info("Initializing Beanie with document models...")
         
         # Initialize Beanie with all document models
@@ -93,6 +122,157 @@ async def init_mongodb():
         # Don't raise - allow app to start but operations will fail
 
 
+async def _backfill_policy_soft_delete_flag(collection):
+    """
+    Set is_deleted=False on policies stored without the flag, so live-policy
+    queries can use {"is_deleted": False} and the partial indexes on it.
+    Matches nothing once every policy has the flag.
+    """
+    try:
+        result = await collection.update_many(
+            {"is_deleted": {"$exists": False}},
+            {"$set": {"is_deleted": False}}
+        )
+        if result.modified_count:
+            logger.info(f"Backfilled is_deleted=False on {result.modified_count} policies")
+    except Exception as e:
+        logger.warning(f"Could not backfill policy is_deleted flag: {e}")
+
+
+async def _backfill_policy_content_hash(collection):
+    """
+    Store content_hash on policies created before the field existed, so the
+    duplicate-configuration lookup and its unique index cover them.
+    
+    Runs before the unique index exists, so duplicates among live policies are
+    detected here: the first keeps its place, later ones are soft-deleted with
+    their hash set (and logged with the id they duplicate). A live policy
+    without its hash would fail every later save, since the save hook
+    recomputes it. Soft-deleted ones stay in the deleted list for review.
+    """
+    from pymongo import UpdateOne
+    from app.models_mongo.policies import policy_content_hash
+    from app.utils.datetime_utils import get_current_time
+    
+    try:
+        live_ids = {
+            doc["content_hash"]: doc["_id"]
+            async for doc in collection.find(
+                {"is_deleted": False, "content_hash": {"$type": "string"}}, {"content_hash": 1}
+            )
+        }
+        updates = []
+        cursor = collection.find(
+            {"content_hash": {"$exists": False}},
+            {"entity_types": 1, "action": 1, "severity": 1, "is_deleted": 1}
+        )
+        async for doc in cursor:
+            content_hash = policy_content_hash(
+                doc.get("entity_types") or [], doc.get("action", ""), doc.get("severity", "medium")
+            )
+            changes = {"content_hash": content_hash}
+            if not doc.get("is_deleted", False):
+                if content_hash in live_ids:
+                    logger.warning(
+                        f"Policy {doc['_id']} duplicates the configuration of live policy "
+                        f"{live_ids[content_hash]}; soft-deleted it"
+                    )
+                    changes.update(is_deleted=True, updated_at=get_current_time())
+                else:
+                    live_ids[content_hash] = doc["_id"]
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+            if len(updates) >= BACKFILL_BATCH_SIZE:
+                await collection.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+    except Exception as e:
+        logger.warning(f"Could not backfill policy content_hash: {e}")
+
+
+async def _dedupe_live_policy_names(collection):
+    """
+    Give every live policy a distinct name before the name_unique_live index is
+    built, and drop the old non-unique name_1 index that shares its key.
+    
+    Older versions allowed live policies with the same name. The oldest keeps
+    the name and later ones are renamed to "<name> (<id>)"; each rename is
+    logged. Returns at once when name_unique_live already exists.
+    """
+    from pymongo import UpdateOne
+    
+    try:
+        indexes = await collection.index_information()
+        if "name_unique_live" in indexes:
+            return
+        duplicates = await collection.aggregate([
+            {"$match": {"is_deleted": False}},
+            {"$sort": {"created_at": 1, "_id": 1}},
+            {"$group": {"_id": "$name", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]).to_list(None)
+        updates = []
+        for dup in duplicates:
+            kept_id, *renamed_ids = dup["ids"]
+            for policy_id in renamed_ids:
+                suffix = f" ({policy_id})"
+                new_name = f"{dup['_id'][:POLICY_NAME_MAX_LENGTH - len(suffix)]}{suffix}"
+                logger.warning(
+                    f"Policy {policy_id} shares the name {dup['_id']!r} with live policy {kept_id}; "
+                    f"renamed to {new_name!r}"
+                )
+                updates.append(UpdateOne({"_id": policy_id}, {"$set": {"name": new_name}}))
+        for start in range(0, len(updates), BACKFILL_BATCH_SIZE):
+            await collection.bulk_write(updates[start:start + BACKFILL_BATCH_SIZE], ordered=False)
+        if "name_1" in indexes:
+            await collection.drop_index("name_1")
+            logger.info("Dropped index name_1; it is replaced by name_unique_live")
+    except Exception as e:
+        logger.warning(f"Could not prepare unique policy names: {e}")
+
+
+async def _prepare_user_unique_indexes(collection):
+    """
+    Make way for the unique username/email indexes declared on User.
+    
+    Older databases have non-unique username_1/email_1 indexes on the same keys,
+    and MongoDB will not build a second index on a key pattern with different
+    options, so those are dropped here and init_beanie creates the unique ones.
+    Duplicate values would fail the unique build as well: they are logged and
+    startup stops with the old indexes untouched until the accounts are merged
+    or renamed. Returns at once when the unique indexes already exist.
+    """
+    indexes = await collection.index_information()
+    pending = [
+        (field, legacy)
+        for field, unique, legacy in USER_UNIQUE_INDEXES
+        if unique not in indexes
+    ]
+    if not pending:
+        return
+    
+    duplicated = False
+    for field, _ in pending:
+        duplicates = await collection.aggregate([
+            {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]).to_list(None)
+        for dup in duplicates:
+            duplicated = True
+            ids = ", ".join(str(i) for i in dup["ids"])
+            logger.error(f"Users share {field} {dup['_id']!r}: {ids}")
+    if duplicated:
+        raise RuntimeError(
+            "Duplicate usernames/emails prevent the unique user indexes; "
+            "merge or rename the accounts listed above and restart"
+        )
+    
+    for field, legacy in pending:
+        if legacy in indexes:
+            await collection.drop_index(legacy)
+            logger.info(f"Dropped index {legacy}; it is replaced by a unique index on {field}")
+
+
 def is_initialized():
     """Check if MongoDB is initialized"""
     return _initialized
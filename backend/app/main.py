@@ -2,17 +2,27 @@
 Main FastAPI application
 """
 import sys
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from app.config import settings
-from app.database_mongo import init_mongodb, close_mongodb
+from app.database_mongo import init_mongodb, close_mongodb, is_initialized
 from app.api.routes import analysis, policies, alerts, monitoring
 from app.api.routes import email_receiver, auth, users, departments
 from app.middleware.mongodb_check import MongoDBCheckMiddleware
 from app.middleware.file_scanner import FileScannerMiddleware
+from app.utils.datetime_utils import get_current_time
+from app.utils.log_handlers import BufferedFileHandler, DroppingQueueHandler
+from logging.handlers import QueueListener
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import hashlib
 import logging
 import os
+import queue
+import time
 
 # Configure logging
 os.makedirs("logs", exist_ok=True)
@@ -27,34 +37,66 @@ except Exception:
     # Don't block startup if console can't be reconfigured
     pass
 
+# Loggers only enqueue records; a background QueueListener thread owns the
+# file/console handlers, so request handlers never block on log writes.
+# The file handler buffers writes and flushes every 0.5 s.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    BufferedFileHandler(settings.LOG_FILE, encoding="utf-8"),
+    logging.StreamHandler(stream=sys.stdout)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+# Bounded so a stalled handler can't grow memory without limit; records that
+# arrive while it is full are dropped and counted (reported at shutdown)
+_log_queue = queue.Queue(maxsize=10000)
+log_queue_handler = DroppingQueueHandler(_log_queue)
+log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+log_listener.start()
+
 logging.basicConfig(
     level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(settings.LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler(stream=sys.stdout)
-    ]
+    handlers=[log_queue_handler]
 )
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: startup_event before serving, shutdown_event after"""
+    # The listener starts at import; a previous cycle (reload, another TestClient) stopped it
+    if app.state.log_listener._thread is None:
+        app.state.log_listener.start()
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="نظام متكامل لحماية البيانات الشخصية - Integrated Data Protection System",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse  # orjson encodes datetimes/UUIDs natively, much faster than json
 )
+app.state.log_listener = log_listener
 
 # CORS middleware
+# Explicit methods/headers plus max_age let browsers cache the preflight for a day
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify allowed origins
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
     expose_headers=["Retry-After"],
+    max_age=86400,
 )
 
 # MongoDB check middleware (after CORS)
@@ -79,29 +121,36 @@ if os.getenv("ENVIRONMENT", "").lower() == "test":
     from app.api.routes import test_seed
     app.include_router(test_seed.router)
 
+# Frontend paths, resolved once at import
+# __file__ = backend/app/main.py; project root is the directory above backend/
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
+STATIC_DIR = os.path.join(PROJECT_ROOT, "frontend", "static")
+INDEX_PATH = os.path.join(STATIC_DIR, "index.html")
+INDEX_EXISTS = os.path.isfile(INDEX_PATH)
+
+# Small index.html is kept in memory and served with an ETag; larger files fall back to FileResponse
+INDEX_CACHE_MAX_BYTES = 512 * 1024
+INDEX_BYTES: Optional[bytes] = None
+INDEX_ETAG: Optional[str] = None
+if INDEX_EXISTS and os.path.getsize(INDEX_PATH) < INDEX_CACHE_MAX_BYTES:
+    with open(INDEX_PATH, "rb") as index_file:
+        INDEX_BYTES = index_file.read()
+    INDEX_ETAG = f'"{hashlib.blake2b(INDEX_BYTES, digest_size=8).hexdigest()}"'
+
 # Mount static files for frontend
 try:
-    # Get the project root directory (three levels up from app/main.py)
-    # __file__ = backend/app/main.py
-    # app_dir = backend/app
-    # backend_dir = backend
-    # project_root = Secure (project root)
-    current_file = os.path.abspath(__file__)
-    app_dir = os.path.dirname(current_file)  # backend/app
-    backend_dir = os.path.dirname(app_dir)   # backend
-    project_root = os.path.dirname(backend_dir)  # Secure (project root)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Static files directory: {STATIC_DIR} (exists: {os.path.exists(STATIC_DIR)})")
+        logger.debug(f"Frontend index.html at {INDEX_PATH}: {'found' if INDEX_EXISTS else 'not found'}")
     
-    static_dir = os.path.join(project_root, "frontend", "static")
-    logger.info(f"Static files directory: {static_dir}")
-    logger.info(f"Static directory exists: {os.path.exists(static_dir)}")
-    
-    if os.path.exists(static_dir):
-        app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    if os.path.exists(STATIC_DIR):
+        app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
         logger.info(f"Static files mounted successfully at /static")
     else:
-        logger.warning(f"Static directory not found: {static_dir}")
+        logger.warning(f"Static directory not found: {STATIC_DIR}")
         # Try alternative path (if running from backend directory)
-        alt_static_dir = os.path.join(backend_dir, "frontend", "static")
+        alt_static_dir = os.path.join(BACKEND_DIR, "frontend", "static")
         if os.path.exists(alt_static_dir):
             app.mount("/static", StaticFiles(directory=alt_static_dir), name="static")
             logger.info(f"Static files mounted from alternative path: {alt_static_dir}")
@@ -111,7 +160,6 @@ except Exception as e:
     logger.warning(traceback.format_exc())
 
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
@@ -122,19 +170,23 @@ async def startup_event():
         logger.info("MongoDB database initialized successfully")
         
         # Create default admin if doesn't exist (only if MongoDB is initialized)
-        from app.database_mongo import is_initialized
-        
-        if is_initialized():
+        if os.getenv("SKIP_BOOTSTRAP"):
+            # Set on all but one worker (or after the first deploy) to skip the default-data checks
+            logger.info("SKIP_BOOTSTRAP set - skipping default admin/policy/department creation")
+        elif is_initialized():
             from app.models_mongo.users import User, UserRole, UserStatus
             from app.services.auth_service import get_password_hash
-            from app.utils.datetime_utils import get_current_time
             
             try:
-                admin = await User.find_one({"role": UserRole.ADMIN.value})
+                # Projected existence check first, so the password is only hashed when needed
+                admin = await User.get_motor_collection().find_one(
+                    {"role": UserRole.ADMIN.value}, {"username": 1}
+                )
                 if not admin:
                     logger.info("Creating default admin user...")
                     admin_password = "admin123"
-                    hashed_password = get_password_hash(admin_password)
+                    # bcrypt is CPU-bound; keep the event loop free while it runs
+                    hashed_password = await asyncio.to_thread(get_password_hash, admin_password)
                     admin_user = User(
                         username="admin",
                         email="admin@example.com",
@@ -144,10 +196,16 @@ async def startup_event():
                         is_active=True,
                         approved_at=get_current_time()
                     )
-                    await admin_user.insert()
-                    logger.info("Default admin created: username=admin, password=admin123")
+                    # Upsert keyed on the admin role: workers starting together create one admin
+                    result = await User.get_motor_collection().update_one(
+                        {"role": UserRole.ADMIN.value},
+                        {"$setOnInsert": admin_user.model_dump(exclude={"id", "revision_id"})},
+                        upsert=True
+                    )
+                    if result.upserted_id is not None:
+                        logger.info("Default admin created: username=admin, password=admin123")
                 else:
-                    logger.info(f"Admin user already exists: {admin.username}")
+                    logger.info(f"Admin user already exists: {admin['username']}")
             except Exception as e:
                 logger.error(f"Error creating/checking admin user: {e}")
                 import traceback
@@ -188,33 +246,28 @@ async def startup_event():
         logger.warning("=" * 60)
 
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     await close_mongodb()
+    if log_queue_handler.dropped:
+        logger.warning(f"Dropped {log_queue_handler.dropped} log records while the log queue was full")
     logger.info("Application shutdown complete")
+    # Drain queued records to the handlers before the process exits; stop() may
+    # only run once per start()
+    if app.state.log_listener._thread is not None:
+        app.state.log_listener.stop()
 
 
 @app.get("/", include_in_schema=False)
-async def root():
+async def root(request: Request):
     """Root endpoint - serve frontend or API info"""
-    from fastapi.responses import FileResponse, HTMLResponse
-    import os
-    
-    # Get the project root directory (two levels up from app/main.py)
-    current_file = os.path.abspath(__file__)
-    app_dir = os.path.dirname(current_file)
-    backend_dir = os.path.dirname(app_dir)
-    project_root = os.path.dirname(backend_dir)
-    
-    static_dir = os.path.join(project_root, "frontend", "static")
-    index_path = os.path.join(static_dir, "index.html")
-    
-    logger.info(f"Looking for index.html at: {index_path}")
-    logger.info(f"File exists: {os.path.exists(index_path)}")
-    
-    if os.path.exists(index_path):
-        return FileResponse(index_path, media_type="text/html")
+    if INDEX_BYTES is not None:
+        headers = {"ETag": INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+        if request.headers.get("if-none-match") == INDEX_ETAG:
+            return Response(status_code=304, headers=headers)
+        return Response(INDEX_BYTES, media_type="text/html", headers=headers)
+    if INDEX_EXISTS:
+        return FileResponse(INDEX_PATH, media_type="text/html")
     
     # Fallback to JSON if HTML not found
     return {
@@ -226,22 +279,26 @@ async def root():
     }
 
 
+# /health timestamp, refreshed at most once per second
+_health_timestamp = [0.0, ""]
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    from app.database_mongo import is_initialized, client
-    from app.utils.datetime_utils import get_current_time
+    initialized = is_initialized()
     
-    mongodb_status = "connected" if is_initialized() else "disconnected"
-    status = "healthy" if is_initialized() else "degraded"
+    now = time.monotonic()
+    if now - _health_timestamp[0] >= 1.0:
+        _health_timestamp[0] = now
+        _health_timestamp[1] = get_current_time().isoformat()
     
     return {
-        "status": status,
+        "status": "healthy" if initialized else "degraded",
         "mongodb": {
-            "status": mongodb_status,
-            "initialized": is_initialized(),
-            "message": "MongoDB is connected and ready" if is_initialized() else "MongoDB is not connected. Please start MongoDB service."
+            "status": "connected" if initialized else "disconnected",
+            "initialized": initialized,
+            "message": "MongoDB is connected and ready" if initialized else "MongoDB is not connected. Please start MongoDB service."
         },
-        "timestamp": get_current_time().isoformat()
+        "timestamp": _health_timestamp[1]
     }
-
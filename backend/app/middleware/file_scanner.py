@@ -1,18 +1,48 @@
 """
 Middleware for scanning uploaded files for malicious content
 """
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from fastapi import status
+from typing import Iterable, List, Optional
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# Malicious script patterns searched for in uploaded content (bytes patterns,
+# so the raw upload is matched without decoding it to str first)
+MALICIOUS_PATTERNS = [
+    (rb'<script[^>]*>.*?</script>', 'JavaScript script tag'),
+    (rb'javascript\s*:', 'JavaScript protocol'),
+    (rb'eval\s*\(', 'JavaScript/Python eval()'),
+    (rb'exec\s*\(', 'Python exec()'),
+    (rb'__import__\s*\(', 'Python __import__()'),
+    (rb'bash\s+-c', 'Bash command execution'),
+    (rb'sh\s+-c', 'Shell command execution'),
+    (rb"'\s*OR\s*['\"]?\s*1\s*=\s*1", 'SQL injection'),
+    (rb'UNION\s+SELECT', 'SQL UNION injection'),
+    (rb'<img[^>]*onerror\s*=', 'XSS img onerror'),
+]
 
-class FileScannerMiddleware(BaseHTTPMiddleware):
-    """Middleware to scan files for malicious content before processing"""
+# Compiled once into a single alternation; the named group p<i> that matched
+# maps back to MALICIOUS_PATTERNS[i]. When several patterns occur, the one
+# starting earliest in the content is reported (list order breaks ties).
+_MALICIOUS_RE = re.compile(
+    b"|".join(b"(?P<p%d>%s)" % (i, pattern) for i, (pattern, _) in enumerate(MALICIOUS_PATTERNS)),
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class FileScannerMiddleware:
+    """
+    Middleware to scan files for malicious content before processing.
+    
+    Plain ASGI middleware: only the first SCAN_PREFIX_SIZE bytes of an upload
+    are read for scanning, then replayed to the route ahead of the rest of the
+    body, so uploads are never buffered whole in memory here.
+    """
     
     # Dangerous file signatures (magic bytes)
     DANGEROUS_SIGNATURES = {
@@ -21,50 +51,132 @@ class FileScannerMiddleware(BaseHTTPMiddleware):
         b'\xca\xfe\xba\xbe': 'Java class file',
         b'PK\x03\x04': 'ZIP/Office file (could contain macros)',
     }
+    _SIGNATURE_LENGTHS = tuple(sorted({len(signature) for signature in DANGEROUS_SIGNATURES}))
+    
+    # VBA macro markers looked for inside ZIP/Office files
+    MACRO_SIGNATURES = (
+        b'VBA',
+        b'Macro',
+        b'ThisWorkbook',
+        b'ActiveSheet',
+        b'Application.Run',
+    )
+    
+    # Script shebangs looked for in the first 1KB of binary content
+    SHEBANG_SIGNATURES = (
+        b'#!/bin/bash',
+        b'#!/bin/sh',
+        b'#!/usr/bin/python',
+        b'#!/usr/bin/env python',
+        b'#!/usr/bin/perl',
+    )
     
     # Maximum file size to scan (10MB)
     MAX_SCAN_SIZE = 10 * 1024 * 1024
     
+    # Leading part of the body that is inspected (pattern matching only ever looked at 1MB)
+    SCAN_PREFIX_SIZE = 1024 * 1024
+    
+    # Upload endpoints the scanner applies to
+    SCAN_PATHS = frozenset({"/api/analyze/file", "/api/monitoring/email"})
+    
     # Paths where we allow uploads even if malicious patterns are found:
     # analysis/file and monitoring/email exist to *detect* and report such content, not to execute it.
-    ALLOW_AND_REPORT_PATHS = ("/api/analyze/file", "/api/monitoring/email")
+    ALLOW_AND_REPORT_PATHS = frozenset({"/api/analyze/file", "/api/monitoring/email"})
+    
+    def __init__(self, app: ASGIApp, scan_paths: Optional[Iterable[str]] = None,
+                 allow_and_report_paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self.scan_paths = frozenset(self.SCAN_PATHS if scan_paths is None else scan_paths)
+        self.allow_and_report_paths = frozenset(
+            self.ALLOW_AND_REPORT_PATHS if allow_and_report_paths is None else allow_and_report_paths
+        )
 
-    async def dispatch(self, request: Request, call_next):
-        path = str(request.url.path)
-        # Only scan file upload endpoints
-        if request.method == "POST" and (
-            "/api/analyze/file" in path or "/api/monitoring/email" in path
-        ):
-            # For analysis/email endpoints, do not block on malicious patterns:
-            # let the request through so the analysis runs and shows results (e.g. MALICIOUS_SCRIPT).
-            if any(p in path for p in self.ALLOW_AND_REPORT_PATHS):
-                response = await call_next(request)
-                return response
-            try:
-                # Check if request has files
-                content_type = request.headers.get("content-type", "")
-                if "multipart/form-data" in content_type:
-                    # Read request body
-                    body = await request.body()
-                    
-                    # Scan for dangerous patterns
-                    scan_result = self._scan_content(body)
-                    if not scan_result["safe"]:
-                        logger.warning(f"File upload blocked: {scan_result['reason']}")
-                        return JSONResponse(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            content={
-                                "detail": f"File upload rejected: {scan_result['reason']}",
-                                "blocked": True,
-                                "reason": scan_result['reason']
-                            }
-                        )
-                
-            except Exception as e:
-                logger.error(f"Error in file scanner middleware: {e}")
-        
-        response = await call_next(request)
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        # Only scan file upload endpoints (exact path match)
+        if scope["path"] not in self.scan_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        headers = Headers(scope=scope)
+        if "multipart/form-data" not in headers.get("content-type", ""):
+            await self.app(scope, receive, send)
+            return
+        
+        # For analysis/email endpoints, do not block on malicious patterns:
+        # let the request through so the analysis runs and shows results (e.g. MALICIOUS_SCRIPT).
+        # Their upload size is left to the route, so the size cap below does not apply either.
+        if scope["path"] in self.allow_and_report_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        # Oversized uploads are rejected from the declared length, before any body is received
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.MAX_SCAN_SIZE:
+            logger.warning(f"File upload blocked: {content_length} bytes exceeds scan limit")
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={
+                    "detail": "File upload rejected: File too large for scanning",
+                    "blocked": True,
+                    "reason": "File too large for scanning"
+                }
+            )
+            await response(scope, receive, send)
+            return
+        
+        # Owned here so that messages already received are replayed even if reading fails partway
+        buffered: List[Message] = []
+        try:
+            prefix = await self._read_prefix(receive, self.SCAN_PREFIX_SIZE, buffered)
+            scan_result = self._scan_content(prefix)
+            if not scan_result["safe"]:
+                logger.warning(f"File upload blocked: {scan_result['reason']}")
+                response = JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={
+                        "detail": f"File upload rejected: {scan_result['reason']}",
+                        "blocked": True,
+                        "reason": scan_result['reason']
+                    }
+                )
+                await response(scope, receive, send)
+                return
+        except Exception as e:
+            logger.error(f"Error in file scanner middleware: {e}")
+        
+        async def replay_receive() -> Message:
+            # Hand back the messages consumed for scanning, then continue with the live stream
+            if buffered:
+                return buffered.pop(0)
+            return await receive()
+        
+        await self.app(scope, replay_receive, send)
+    
+    @staticmethod
+    async def _read_prefix(receive: Receive, limit: int, messages: List[Message]) -> bytes:
+        """
+        Receive body messages until at least limit bytes (or the whole body) have arrived.
+        
+        Every message received is appended to messages as soon as it arrives.
+        """
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        while more_body and size < limit:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            chunks.append(chunk)
+            size += len(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)[:limit]
     
     def _scan_content(self, content: bytes) -> dict:
         """
@@ -83,41 +195,26 @@ class FileScannerMiddleware(BaseHTTPMiddleware):
         if len(content) > self.MAX_SCAN_SIZE:
             return {"safe": False, "reason": "File too large for scanning"}
         
-        # Check magic bytes (file signatures)
-        for signature, description in self.DANGEROUS_SIGNATURES.items():
-            if content.startswith(signature):
-                # Allow ZIP/Office files but warn
-                if signature == b'PK\x03\x04':
-                    # Check for embedded scripts in Office files
-                    if self._check_office_macros(content):
-                        return {"safe": False, "reason": f"Office file contains macros: {description}"}
-                else:
-                    return {"safe": False, "reason": f"Dangerous file type detected: {description}"}
-        
-        # Convert to string for pattern matching (only first 1MB to avoid memory issues)
-        try:
-            text_content = content[:1024*1024].decode('utf-8', errors='ignore')
-        except Exception:
-            # Binary file, check for embedded scripts in binary
-            return self._scan_binary_content(content)
-        
-        # Check for malicious script patterns
-        malicious_patterns = [
-            (r'<script[^>]*>.*?</script>', 'JavaScript script tag'),
-            (r'javascript\s*:', 'JavaScript protocol'),
-            (r'eval\s*\(', 'JavaScript/Python eval()'),
-            (r'exec\s*\(', 'Python exec()'),
-            (r'__import__\s*\(', 'Python __import__()'),
-            (r'bash\s+-c', 'Bash command execution'),
-            (r'sh\s+-c', 'Shell command execution'),
-            (r"'\s*OR\s*['\"]?\s*1\s*=\s*1", 'SQL injection'),
-            (r'UNION\s+SELECT', 'SQL UNION injection'),
-            (r'<img[^>]*onerror\s*=', 'XSS img onerror'),
-        ]
-        
-        for pattern, description in malicious_patterns:
-            if re.search(pattern, text_content, re.IGNORECASE | re.DOTALL):
-                return {"safe": False, "reason": f"Malicious pattern detected: {description}"}
+        # Check magic bytes (file signatures): one dict lookup per signature length
+        for length in self._SIGNATURE_LENGTHS:
+            signature = content[:length]
+            description = self.DANGEROUS_SIGNATURES.get(signature)
+            if description is None:
+                continue
+            # Allow ZIP/Office files but warn
+            if signature == b'PK\x03\x04':
+                # Check for embedded scripts in Office files
+                if self._check_office_macros(content):
+                    return {"safe": False, "reason": f"Office file contains macros: {description}"}
+            else:
+                return {"safe": False, "reason": f"Dangerous file type detected: {description}"}
+        
+        # Check for malicious script patterns: one pass over the first 1MB,
+        # matched on the bytes directly (memoryview slice, no copy or decode)
+        match = _MALICIOUS_RE.search(memoryview(content)[:self.SCAN_PREFIX_SIZE])
+        if match:
+            description = MALICIOUS_PATTERNS[int(match.lastgroup[1:])][1]
+            return {"safe": False, "reason": f"Malicious pattern detected: {description}"}
         
         return {"safe": True, "reason": ""}
     
@@ -132,19 +229,7 @@ class FileScannerMiddleware(BaseHTTPMiddleware):
             True if macros detected, False otherwise
         """
         # Look for VBA macro signatures in Office files
-        macro_patterns = [
-            b'VBA',
-            b'Macro',
-            b'ThisWorkbook',
-            b'ActiveSheet',
-            b'Application.Run',
-        ]
-        
-        for pattern in macro_patterns:
-            if pattern in content:
-                return True
-        
-        return False
+        return any(pattern in content for pattern in self.MACRO_SIGNATURES)
     
     def _scan_binary_content(self, content: bytes) -> dict:
         """
@@ -158,16 +243,9 @@ class FileScannerMiddleware(BaseHTTPMiddleware):
         """
         # Check for embedded executables or scripts in binary
         # Look for common script shebangs
-        shebangs = [
-            b'#!/bin/bash',
-            b'#!/bin/sh',
-            b'#!/usr/bin/python',
-            b'#!/usr/bin/env python',
-            b'#!/usr/bin/perl',
-        ]
-        
-        for shebang in shebangs:
-            if shebang in content[:1024]:  # Check first 1KB
+        head = content[:1024]  # Check first 1KB
+        for shebang in self.SHEBANG_SIGNATURES:
+            if shebang in head:
                 return {"safe": False, "reason": f"Executable script detected: {shebang.decode('utf-8', errors='ignore')}"}
         
         return {"safe": True, "reason": ""}
@@ -1,35 +1,57 @@
 """
 Middleware to check MongoDB initialization before processing requests
 """
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.database_mongo import is_initialized
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Requests that never need the database: health, API docs, the frontend page and static files
+_SKIP_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json", "/static")
+_EXACT_SKIP = {"/"}
 
-class MongoDBCheckMiddleware(BaseHTTPMiddleware):
-    """Middleware to ensure MongoDB is initialized before processing requests"""
+# 503 body sent while MongoDB is down; serialized once, reused for every rejected request
+_DB_NOT_INITIALIZED_BODY = orjson.dumps({
+    "detail": "Database not initialized. MongoDB is not running or not accessible.",
+    "error": "MongoDB connection failed",
+    "solution": "Please install and start MongoDB. See MONGODB_QUICK_START.md for instructions.",
+    "help_url": "https://www.mongodb.com/try/download/community"
+})
+
+
+class MongoDBCheckMiddleware:
+    """
+    Middleware to ensure MongoDB is initialized before processing requests.
+    Plain ASGI middleware, so passing requests through costs no extra task or stream.
+    """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Skip check for health endpoint and static files
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/", "/static"]
-        if any(request.url.path.startswith(path) for path in skip_paths):
-            return await call_next(request)
+        path = scope["path"]
+        if path in _EXACT_SKIP or path.startswith(_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
         
         # Check if MongoDB is initialized
         if not is_initialized():
-            logger.error(f"MongoDB not initialized - rejecting request to {request.url.path}")
-            return JSONResponse(
+            logger.error(f"MongoDB not initialized - rejecting request to {path}")
+            response = Response(
+                content=_DB_NOT_INITIALIZED_BODY,
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                content={
-                    "detail": "Database not initialized. MongoDB is not running or not accessible.",
-                    "error": "MongoDB connection failed",
-                    "solution": "Please install and start MongoDB. See MONGODB_QUICK_START.md for instructions.",
-                    "help_url": "https://www.mongodb.com/try/download/community"
-                }
+                media_type="application/json"
             )
+            await response(scope, receive, send)
+            return
         
-        return await call_next(request)
+        await self.app(scope, receive, send)
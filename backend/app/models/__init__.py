@@ -1,10 +1,30 @@
 """
 Database models
+
+Loaded lazily (PEP 562): importing one submodule such as app.models.users no
+longer pulls in every model. Accessing any name below loads all models, so
+string-based relationships (e.g. Alert.policy -> "Policy") always resolve.
 """
-from app.models.policies import Policy
-from app.models.alerts import Alert
-from app.models.logs import Log, DetectedEntity
-from app.models.users import User, UserRole, UserStatus
+import importlib
+
+_EXPORTS = {
+    "Policy": "app.models.policies",
+    "Alert": "app.models.alerts",
+    "Log": "app.models.logs",
+    "DetectedEntity": "app.models.logs",
+    "User": "app.models.users",
+    "UserRole": "app.models.users",
+    "UserStatus": "app.models.users",
+}
 
 __all__ = ["Policy", "Alert", "Log", "DetectedEntity", "User", "UserRole", "UserStatus"]
 
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for module_name in dict.fromkeys(_EXPORTS.values()):
+        importlib.import_module(module_name)
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
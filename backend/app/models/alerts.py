@@ -8,7 +8,7 @@ import enum
 from app.database import Base
 
 
-class AlertStatus(enum.Enum):
+class AlertStatus(str, enum.Enum):
     """Alert status enumeration"""
     PENDING = "pending"
     ACKNOWLEDGED = "acknowledged"
@@ -16,7 +16,7 @@ class AlertStatus(enum.Enum):
     FALSE_POSITIVE = "false_positive"
 
 
-class AlertSeverity(enum.Enum):
+class AlertSeverity(str, enum.Enum):
     """Alert severity enumeration"""
     LOW = "low"
     MEDIUM = "medium"
@@ -34,8 +34,9 @@ class Alert(Base):
     # Alert information
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    severity = Column(Enum(AlertSeverity), nullable=False, default=AlertSeverity.MEDIUM)
-    status = Column(Enum(AlertStatus), nullable=False, default=AlertStatus.PENDING)
+    # Stored as VARCHAR (native_enum=False): no database ENUM type to look up or cast on insert/fetch
+    severity = Column(Enum(AlertSeverity, native_enum=False, length=20), nullable=False, default=AlertSeverity.MEDIUM)
+    status = Column(Enum(AlertStatus, native_enum=False, length=20), nullable=False, default=AlertStatus.PENDING)
     
     # Source information
     source_ip = Column(String(45), nullable=True)  # IPv6 support
@@ -8,13 +8,13 @@ import enum
 from app.database import Base
 
 
-class UserRole(enum.Enum):
+class UserRole(str, enum.Enum):
     """User role enumeration"""
     REGULAR = "regular"
     ADMIN = "admin"
 
 
-class UserStatus(enum.Enum):
+class UserStatus(str, enum.Enum):
     """User status enumeration"""
     PENDING = "pending"      # في انتظار الموافقة
     APPROVED = "approved"    # موافق عليه
@@ -33,8 +33,9 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     
     # Role and status
-    role = Column(Enum(UserRole), nullable=False, default=UserRole.REGULAR)
-    status = Column(Enum(UserStatus), nullable=False, default=UserStatus.PENDING)
+    # Stored as VARCHAR (native_enum=False): no database ENUM type to look up or cast on insert/fetch
+    role = Column(Enum(UserRole, native_enum=False, length=20), nullable=False, default=UserRole.REGULAR)
+    status = Column(Enum(UserStatus, native_enum=False, length=20), nullable=False, default=UserStatus.PENDING)
     is_active = Column(Boolean, default=False)  # False until approved
     
     # Approval information
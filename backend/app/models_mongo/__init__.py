@@ -1,6 +1,14 @@
 """
 MongoDB models using Beanie ODM
+
+Submodules are imported on first access (PEP 562) rather than all at once.
 """
-from . import users, policies, alerts, logs, departments
+import importlib
 
 __all__ = ["users", "policies", "alerts", "logs", "departments"]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f"{__name__}.{name}")
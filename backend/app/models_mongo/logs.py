@@ -3,9 +3,12 @@ Log and DetectedEntity models for MongoDB using Beanie
 """
 from beanie import Document
 from pydantic import Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
 from datetime import datetime
 from app.utils.datetime_utils import get_current_time
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class Log(Document):
@@ -86,5 +89,41 @@ class DetectedEntity(Document):
             "created_at"
         ]
     
+    @classmethod
+    def from_detections(
+        cls,
+        detections: List[Dict[str, Any]],
+        encrypt: Callable[[str], str],
+        action: str,
+        source_text_hash: Optional[str] = None,
+        source_file: Optional[str] = None,
+    ) -> List["DetectedEntity"]:
+        """
+        Build documents from analyzer detections (entity_type, value, score, start, end),
+        encrypting each value. A detection that cannot be encrypted or built is logged and skipped.
+        """
+        documents = []
+        for detection in detections:
+            try:
+                documents.append(cls(
+                    entity_type=detection["entity_type"],
+                    value=encrypt(detection["value"]),
+                    confidence=detection["score"],
+                    start_position=detection["start"],
+                    end_position=detection["end"],
+                    source_text_hash=source_text_hash,
+                    source_file=source_file,
+                    action=action
+                ))
+            except Exception as e:
+                logger.error(f"Error encrypting or building detected entity: {e}")
+        return documents
+    
+    @classmethod
+    async def bulk_insert(cls, entities: List["DetectedEntity"], batch_size: int = 500) -> None:
+        """Insert entities with one insert_many per batch instead of one round-trip each"""
+        for start in range(0, len(entities), batch_size):
+            await cls.insert_many(entities[start:start + batch_size])
+    
     def __repr__(self):
         return f"<DetectedEntity(id={self.id}, entity_type='{self.entity_type}', confidence={self.confidence})>"
@@ -1,13 +1,26 @@
 """
 Policy model for MongoDB using Beanie
 """
-from beanie import Document
-from pydantic import Field
+from beanie import Document, Insert, PydanticObjectId, Replace, Save, before_event
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import List, Optional
 from datetime import datetime
+import hashlib
 from app.utils.datetime_utils import get_current_time
 
 
+def normalize_entity_types(entity_types: List[str]) -> List[str]:
+    """Canonical form of a policy's entity types: order and repeats don't matter"""
+    return sorted(set(entity_types))
+
+
+def policy_content_hash(entity_types: List[str], action: str, severity: str) -> str:
+    """Signature of a policy's configuration; equal for policies that duplicate each other"""
+    signature = f"{action}|{severity}|{','.join(normalize_entity_types(entity_types))}"
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+
 class Policy(Document):
     """Policy model for defining data protection rules"""
     
@@ -34,14 +47,63 @@ class Policy(Document):
     updated_at: Optional[datetime] = None
     created_by: Optional[str] = None
     is_deleted: bool = Field(default=False)  # Soft delete flag
+    content_hash: Optional[str] = None  # policy_content_hash(), kept in sync on write
     
     class Settings:
         name = "policies"  # Collection name
         indexes = [
-            "name",
+            # Names are unique among live policies; soft-deleted ones may share a name
+            IndexModel(
+                [("name", ASCENDING)],
+                name="name_unique_live",
+                unique=True,
+                partialFilterExpression={"is_deleted": False},
+            ),
             "enabled",
-            "is_deleted"
+            "is_deleted",
+            # At most one live policy per configuration (entity types, action, severity)
+            IndexModel(
+                [("content_hash", ASCENDING)],
+                name="content_hash_unique_live",
+                unique=True,
+                partialFilterExpression={"is_deleted": False, "content_hash": {"$type": "string"}},
+            ),
+            # Backs the newest-first policy list and its keyset cursor; covers live policies only
+            IndexModel(
+                [("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="live_by_created",
+                partialFilterExpression={"is_deleted": False},
+            ),
+            # Backs the deleted-policies list (equality on is_deleted, sort on updated_at)
+            IndexModel(
+                [("is_deleted", ASCENDING), ("updated_at", DESCENDING)],
+                name="deleted_by_updated",
+            ),
         ]
     
+    @before_event(Insert, Replace, Save)
+    def set_content_hash(self):
+        self.content_hash = policy_content_hash(self.entity_types, self.action, self.severity)
+    
     def __repr__(self):
         return f"<Policy(id={self.id}, name='{self.name}', action='{self.action}')>"
+
+
+class PolicyListProjection(BaseModel):
+    """Projection with only the fields rendered by PolicyResponse (list endpoints)"""
+    
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    description: Optional[str] = None
+    entity_types: List[str]
+    action: str
+    severity: str = "medium"
+    enabled: bool = True
+    apply_to_network: bool = True
+    apply_to_devices: bool = True
+    apply_to_storage: bool = True
+    gdpr_compliant: bool = False
+    hipaa_compliant: bool = False
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    created_by: Optional[str] = None
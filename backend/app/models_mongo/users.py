@@ -1,8 +1,9 @@
 """
 User model for MongoDB using Beanie
 """
-from beanie import Document
-from pydantic import Field, EmailStr
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field, EmailStr
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -65,9 +66,20 @@ class User(Document):
     class Settings:
         name = "users"  # Collection name
         indexes = [
-            "username",
-            "email",
-            "created_at"
+            # Uniqueness is enforced here; create/update map DuplicateKeyError to 400
+            IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+            "created_at",
+            # Status-filtered lists sorted by created_at (get_users, get_pending_users)
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created"),
+            # Role-filtered lists and manager (department-scoped) lists, newest first
+            IndexModel([("role", ASCENDING), ("created_at", DESCENDING)], name="role_created"),
+            IndexModel([("department_id", ASCENDING), ("created_at", DESCENDING)], name="department_created"),
+            # Active-users list: is_active=True, status in (approved, active), newest first
+            IndexModel(
+                [("is_active", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)],
+                name="active_status_created",
+            ),
         ]
     
     def __repr__(self):
@@ -94,3 +106,21 @@ class User(Document):
         """True if temporarily locked after too many failed MFA code attempts."""
         locked_until = ensure_aware_for_compare(self.mfa_locked_until)
         return locked_until is not None and locked_until > now
+
+
+class UserListProjection(BaseModel):
+    """Projection with only the fields rendered by UserDetailResponse (list endpoints)"""
+    
+    id: PydanticObjectId = Field(alias="_id")
+    username: str
+    email: str
+    role: UserRole = UserRole.REGULAR
+    status: UserStatus = UserStatus.PENDING
+    is_active: bool = False
+    department_id: Optional[str] = None
+    approved_at: Optional[datetime] = None
+    approved_by: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    created_at: datetime
+    last_login: Optional[datetime] = None
+    totp_enabled: bool = False
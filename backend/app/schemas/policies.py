@@ -1,7 +1,7 @@
 """
 Schemas for policy management API
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -39,6 +39,8 @@ class PolicyUpdate(BaseModel):
 
 class PolicyResponse(BaseModel):
     """Schema for policy response"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: str  # MongoDB uses ObjectId (string)
     name: str
     description: Optional[str]
@@ -54,7 +56,10 @@ class PolicyResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     created_by: Optional[str]
-    
-    class Config:
-        from_attributes = True
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, v):
+        """Accept the document's ObjectId and expose it as a string"""
+        return str(v)
 
@@ -106,6 +106,12 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, v):
+        """Accept the document's ObjectId (or None before insert) and expose it as a string"""
+        return str(v) if v is not None else ""
+
 
 class UserDetailResponse(UserResponse):
     """Detailed user response (for admins)"""
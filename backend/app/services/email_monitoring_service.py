@@ -664,12 +664,11 @@ class EmailMonitoringService:
             
             # Store detected entities only if policies matched
             if policy_result.get("policies_matched", False):
-                for entity in detected_entities:
-                    await self._store_detected_entity(
-                        entity=entity,
-                        source_text_hash=self.policy_service.encryption.hash_text(full_text),
-                        source_file=f"email_{from_email}_{get_current_time().timestamp()}"
-                    )
+                await self._store_detected_entities(
+                    entities=detected_entities,
+                    source_text_hash=self.policy_service.encryption.hash_text(full_text),
+                    source_file=f"email_{from_email}_{get_current_time().timestamp()}"
+                )
             
             # Log email so it appears in inbox (only when email is sent: allow/alert/encrypt/anonymize, not block)
             if action != "block":
@@ -983,28 +982,20 @@ class EmailMonitoringService:
             logger.error(f"reanalyze_email_log_for_recipient error: {e}", exc_info=True)
             return {"error": "not_found"}
     
-    async def _store_detected_entity(self, entity: Dict, source_text_hash: str,
+    async def _store_detected_entities(self, entities: List[Dict], source_text_hash: str,
                               source_file: str = None):
-        """Store detected entity in database"""
+        """Store detected entities in database (batched insert)"""
+        documents = DetectedEntity.from_detections(
+            entities,
+            encrypt=self.policy_service.encryption.encrypt,
+            action="detected",
+            source_text_hash=source_text_hash,
+            source_file=source_file,
+        )
         try:
-            # Encrypt the value before storing
-            encrypted_value = self.policy_service.encryption.encrypt(entity["value"])
-            
-            detected_entity = DetectedEntity(
-                entity_type=entity["entity_type"],
-                value=encrypted_value,
-                confidence=entity["score"],
-                start_position=entity["start"],
-                end_position=entity["end"],
-                source_text_hash=source_text_hash,
-                source_file=source_file,
-                action="detected"
-            )
-            
-            await detected_entity.insert()
-            
+            await DetectedEntity.bulk_insert(documents)
         except Exception as e:
-            logger.error(f"Error storing detected entity: {e}")
+            logger.error(f"Error storing detected entities: {e}")
     
     async def get_email_statistics(self, days: int = 7) -> Dict[str, Any]:
         """
@@ -3,6 +3,7 @@ MyDLP service for data loss prevention and monitoring
 """
 import requests
 import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from app.config import settings
 
@@ -220,3 +221,8 @@ class MyDLPService:
         """Check if MyDLP is running on localhost"""
         return self.is_localhost
 
+
+@lru_cache(maxsize=1)
+def get_mydlp_service() -> MyDLPService:
+    """Shared instance for API routes, created on first use (one per process)"""
+    return MyDLPService()
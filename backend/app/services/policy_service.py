@@ -292,11 +292,10 @@ class PolicyService:
                 )
                 
                 # Store detected entities only if policies matched
-                for entity in detected_entities:
-                    await self._store_detected_entity(
-                        entity=entity,
-                        source_text_hash=self.encryption.hash_text(text)
-                    )
+                await self._store_detected_entities(
+                    entities=detected_entities,
+                    source_text_hash=self.encryption.hash_text(text)
+                )
         else:
             # No policies matched - log but don't take any action
             logger.info(f"Detected {len(detected_entities)} entities but no matching policies found - no actions taken")
@@ -481,23 +480,15 @@ class PolicyService:
         except Exception as e:
             logger.error(f"Error logging event: {e}")
     
-    async def _store_detected_entity(self, entity: Dict, source_text_hash: str):
-        """Store detected entity in database"""
+    async def _store_detected_entities(self, entities: List[Dict], source_text_hash: str):
+        """Store detected entities in database (batched insert)"""
+        documents = DetectedEntity.from_detections(
+            entities,
+            encrypt=self.encryption.encrypt,
+            action="encrypted",
+            source_text_hash=source_text_hash,
+        )
         try:
-            # Encrypt the value before storing
-            encrypted_value = self.encryption.encrypt(entity["value"])
-            
-            detected_entity = DetectedEntity(
-                entity_type=entity["entity_type"],
-                value=encrypted_value,
-                confidence=entity["score"],
-                start_position=entity["start"],
-                end_position=entity["end"],
-                source_text_hash=source_text_hash,
-                action="encrypted"
-            )
-            
-            await detected_entity.insert()
-            
+            await DetectedEntity.bulk_insert(documents)
         except Exception as e:
-            logger.error(f"Error storing detected entity: {e}")
+            logger.error(f"Error storing detected entities: {e}")
@@ -0,0 +1,67 @@
+"""
+Logging handlers
+"""
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that batches records in a large write buffer instead of
+    flushing after every record. A daemon thread flushes every flush_interval
+    seconds; close() (called by logging.shutdown at exit) flushes the rest.
+    """
+
+    def __init__(self, filename: str, encoding: str = "utf-8",
+                 buffer_size: int = 64 * 1024, flush_interval: float = 0.5):
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode="a", encoding=encoding)
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-file-flusher",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Same as StreamHandler.emit minus the per-record flush
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop_flushing.wait(interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop_flushing.set()
+        super().close()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue: when the queue is full the record is
+    dropped and counted instead of raising queue.Full, which QueueHandler would
+    report through handleError with a traceback on stderr for every record.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
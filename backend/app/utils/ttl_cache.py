@@ -0,0 +1,62 @@
+"""
+Small in-process TTL cache for read-mostly dashboard endpoints.
+Each worker process keeps its own copy; entries simply expire after ttl_seconds.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Key/value store whose entries expire ttl_seconds after being set.
+
+    With maxsize set, the least recently used entry is evicted once the cache
+    is full, and expired entries are swept out at most once per ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._next_sweep = time.monotonic() + ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        if self.maxsize is None:
+            return
+        if now >= self._next_sweep:
+            self._sweep(now)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        """Drop every expired entry."""
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        self._next_sweep = now + self.ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop one entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry (use after writes that change the cached data)."""
+        self._entries.clear()
@@ -0,0 +1,23 @@
+-- Convert the native PostgreSQL ENUM columns of existing databases to VARCHAR(20).
+--
+-- The SQLAlchemy models now declare these columns as
+-- Enum(..., native_enum=False, length=20). Tables created by init_db.py from
+-- now on are already VARCHAR; run this once on a database created before that
+-- change. Stored values (the enum names, e.g. 'MEDIUM', 'ADMIN') are kept as is.
+--
+--   psql -U Secure_user -d Secure_db -f migrate_enum_columns_to_varchar.sql
+
+BEGIN;
+
+ALTER TABLE alerts ALTER COLUMN severity TYPE VARCHAR(20) USING severity::text;
+ALTER TABLE alerts ALTER COLUMN status TYPE VARCHAR(20) USING status::text;
+ALTER TABLE users ALTER COLUMN role TYPE VARCHAR(20) USING role::text;
+ALTER TABLE users ALTER COLUMN status TYPE VARCHAR(20) USING status::text;
+
+-- Type names SQLAlchemy derived from the enum classes (lowercased class name)
+DROP TYPE IF EXISTS alertseverity;
+DROP TYPE IF EXISTS alertstatus;
+DROP TYPE IF EXISTS userrole;
+DROP TYPE IF EXISTS userstatus;
+
+COMMIT;
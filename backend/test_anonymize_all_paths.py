@@ -50,7 +50,7 @@ def _patch_policy_service(svc: PolicyService, policies: list):
         mock.patch.object(svc, "get_active_policies", mock.AsyncMock(return_value=policies)),
         mock.patch.object(svc, "_create_alert", mock.AsyncMock(return_value="fake_alert_id")),
         mock.patch.object(svc, "_log_event", _noop),
-        mock.patch.object(svc, "_store_detected_entity", _noop),
+        mock.patch.object(svc, "_store_detected_entities", _noop),
     ])
 
 
@@ -300,7 +300,7 @@ class TestAnonymizeEmail:
                 mock.AsyncMock(return_value=mock_policy_result),
             ):
                 with mock.patch.object(ems, "_log_email_event", _noop):
-                    with mock.patch.object(ems, "_store_detected_entity", _noop):
+                    with mock.patch.object(ems, "_store_detected_entities", _noop):
                         with mock.patch.object(ems.policy_service, "get_active_policies", mock.AsyncMock(return_value=policies)):
                             result = await ems.analyze_email(email)
 
@@ -352,7 +352,7 @@ class TestAnonymizeEmail:
                 mock.AsyncMock(return_value=mock_policy_result),
             ):
                 with mock.patch.object(ems, "_log_email_event", _noop):
-                    with mock.patch.object(ems, "_store_detected_entity", _noop):
+                    with mock.patch.object(ems, "_store_detected_entities", _noop):
                         with mock.patch.object(ems.policy_service, "get_active_policies", mock.AsyncMock(return_value=policies)):
                             result = await ems.analyze_email(email)
 
@@ -456,7 +456,7 @@ class TestAnonymizeEmail:
                 mock.AsyncMock(return_value=mock_policy_result),
             ):
                 with mock.patch.object(ems, "_log_email_event", _noop):
-                    with mock.patch.object(ems, "_store_detected_entity", _noop):
+                    with mock.patch.object(ems, "_store_detected_entities", _noop):
                         with mock.patch.object(ems.policy_service, "get_active_policies", mock.AsyncMock(return_value=policies)):
                             result = await ems.analyze_email(email)
 
@@ -512,7 +512,7 @@ class TestAnonymizeEmail:
                         mock.AsyncMock(return_value=mock_policy_result),
                     ):
                         with mock.patch.object(ems, "_log_email_event", _noop):
-                            with mock.patch.object(ems, "_store_detected_entity", _noop):
+                            with mock.patch.object(ems, "_store_detected_entities", _noop):
                                 result = await ems.analyze_email(email)
 
         assert result["action"] == "anonymize"
@@ -592,7 +592,7 @@ class TestAnonymizeEmail:
                         mock.AsyncMock(return_value=mock_policy_result),
                     ):
                         with mock.patch.object(ems, "_log_email_event", _noop):
-                            with mock.patch.object(ems, "_store_detected_entity", _noop):
+                            with mock.patch.object(ems, "_store_detected_entities", _noop):
                                 result = await ems.analyze_email(email)
 
         assert result["action"] == "encrypt"
@@ -649,7 +649,7 @@ class TestAnonymizeEmail:
                 mock.AsyncMock(return_value=mock_policy_result),
             ):
                 with mock.patch.object(ems, "_log_email_event", _capture_log):
-                    with mock.patch.object(ems, "_store_detected_entity", _noop):
+                    with mock.patch.object(ems, "_store_detected_entities", _noop):
                         await ems.analyze_email(email)
 
         ed = captured.get("email_data") or {}
@@ -0,0 +1,68 @@
+"""
+Checks that the app lifespan runs startup before serving and shutdown after,
+and that the log listener keeps draining across lifespan cycles, with MongoDB
+calls faked.
+
+Run from repo root:
+  cd backend && python -m pytest test_app_lifespan.py -v
+"""
+from __future__ import annotations
+
+import logging
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+def test_lifespan_connects_before_serving_and_closes_after(monkeypatch):
+    monkeypatch.setenv("SKIP_BOOTSTRAP", "1")
+    init_mongodb = mock.AsyncMock()
+    close_mongodb = mock.AsyncMock()
+    log_listener = mock.Mock()
+
+    with mock.patch.object(main, "init_mongodb", init_mongodb), \
+            mock.patch.object(main, "close_mongodb", close_mongodb), \
+            mock.patch.object(main.app.state, "log_listener", log_listener):
+        with TestClient(main.app) as client:
+            init_mongodb.assert_awaited_once()
+            close_mongodb.assert_not_awaited()
+            assert client.get("/health").status_code == 200
+
+        close_mongodb.assert_awaited_once()
+        log_listener.stop.assert_called_once()
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_log_listener_drains_across_repeated_lifespan_cycles(monkeypatch):
+    monkeypatch.setenv("SKIP_BOOTSTRAP", "1")
+    recorder = _RecordingHandler()
+    listener = main.app.state.log_listener
+
+    try:
+        with mock.patch.object(main, "init_mongodb", mock.AsyncMock()), \
+                mock.patch.object(main, "close_mongodb", mock.AsyncMock()), \
+                mock.patch.object(listener, "handlers", listener.handlers + (recorder,)):
+            for cycle in range(2):
+                with TestClient(main.app):
+                    main.log_queue_handler.handle(logging.makeLogRecord({"msg": f"cycle {cycle}", "levelno": logging.INFO}))
+                # Shutdown stopped the listener after draining the queue
+                assert listener._thread is None
+                assert f"cycle {cycle}" in recorder.messages
+    finally:
+        if listener._thread is None:
+            listener.start()
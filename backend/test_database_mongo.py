@@ -0,0 +1,92 @@
+"""
+Checks for the startup migrations in app.database_mongo that run before
+init_beanie builds indexes, against fake collections (no MongoDB needed).
+
+Run from repo root:
+  cd backend && python -m pytest test_database_mongo.py -v
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from app import database_mongo
+
+LEGACY_USER_INDEXES = {
+    "_id_": {"key": [("_id", 1)]},
+    "username_1": {"key": [("username", 1)]},
+    "email_1": {"key": [("email", 1)]},
+    "created_at_1": {"key": [("created_at", 1)]},
+}
+
+
+class _FakeAggregation:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length):
+        return list(self.rows)
+
+
+class _FakeUsersCollection:
+    def __init__(self, indexes, duplicates=None):
+        self.indexes = dict(indexes)
+        self.duplicates = duplicates or {}
+        self.grouped_fields = []
+        self.dropped = []
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    def aggregate(self, pipeline):
+        field = pipeline[0]["$group"]["_id"].lstrip("$")
+        self.grouped_fields.append(field)
+        return _FakeAggregation(self.duplicates.get(field, []))
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+        del self.indexes[name]
+
+
+@pytest.mark.asyncio
+async def test_legacy_user_indexes_are_dropped_before_unique_build():
+    collection = _FakeUsersCollection(LEGACY_USER_INDEXES)
+
+    await database_mongo._prepare_user_unique_indexes(collection)
+
+    assert collection.grouped_fields == ["username", "email"]
+    assert collection.dropped == ["username_1", "email_1"]
+    assert "created_at_1" in collection.indexes
+
+
+@pytest.mark.asyncio
+async def test_duplicate_users_are_reported_and_block_startup(caplog):
+    collection = _FakeUsersCollection(
+        LEGACY_USER_INDEXES,
+        duplicates={"email": [{"_id": "a@example.com", "ids": ["u1", "u2"], "count": 2}]},
+    )
+
+    with pytest.raises(RuntimeError):
+        await database_mongo._prepare_user_unique_indexes(collection)
+
+    assert collection.dropped == []
+    assert "Users share email 'a@example.com': u1, u2" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_existing_unique_user_indexes_skip_the_checks():
+    collection = _FakeUsersCollection({
+        "_id_": {"key": [("_id", 1)]},
+        "username_unique": {"key": [("username", 1)], "unique": True},
+        "email_unique": {"key": [("email", 1)], "unique": True},
+    })
+
+    await database_mongo._prepare_user_unique_indexes(collection)
+
+    assert collection.grouped_fields == []
+    assert collection.dropped == []
@@ -0,0 +1,251 @@
+"""
+Checks for FileScannerMiddleware: prefix scan and body replay, upload size cap,
+and the malicious-content scan itself.
+
+Run from repo root:
+  cd backend && python -m pytest test_file_scanner.py -v
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import orjson
+import pytest
+
+from app.middleware.file_scanner import FileScannerMiddleware
+
+UPLOAD_PATH = "/api/analyze/file"
+
+
+def _scope(path: str = UPLOAD_PATH, content_length: int | None = None) -> dict:
+    headers = [(b"content-type", b"multipart/form-data; boundary=xyz")]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    return {"type": "http", "method": "POST", "path": path, "headers": headers}
+
+
+def _receiver(chunks, fail_after: int | None = None):
+    """ASGI receive() yielding chunks as http.request messages; optionally raises after fail_after calls."""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    calls = {"n": 0}
+
+    async def receive():
+        if fail_after is not None and calls["n"] >= fail_after:
+            raise RuntimeError("client went away")
+        calls["n"] += 1
+        return messages.pop(0)
+
+    return receive
+
+
+class _BodyEchoApp:
+    """Downstream app that records the full request body it receives."""
+
+    def __init__(self):
+        self.body = None
+        self.called = False
+
+    async def __call__(self, scope, receive, send):
+        self.called = True
+        chunks = []
+        while True:
+            try:
+                message = await receive()
+            except RuntimeError:
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        self.body = b"".join(chunks)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _run(middleware, scope, receive):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(scope, receive, send)
+    status_code = sent[0]["status"]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return status_code, body
+
+
+def _blocking_scanner(app):
+    # Scan the upload path without the allow-and-report exemption
+    return FileScannerMiddleware(app, allow_and_report_paths=())
+
+
+# --- prefix read and replay ---
+
+@pytest.mark.asyncio
+async def test_scanned_body_is_replayed_to_route_in_full():
+    app = _BodyEchoApp()
+    scanner = _blocking_scanner(app)
+    scanner.SCAN_PREFIX_SIZE = 8
+    chunks = [b"hello ", b"benign ", b"world ", b"tail"]
+
+    status_code, _ = await _run(scanner, _scope(), _receiver(chunks))
+
+    assert status_code == 200
+    assert app.body == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_malicious_prefix_is_blocked_before_route():
+    app = _BodyEchoApp()
+    scanner = _blocking_scanner(app)
+
+    status_code, body = await _run(scanner, _scope(), _receiver([b"x = eval(", b"payload)"]))
+
+    assert status_code == 400
+    assert not app.called
+    assert orjson.loads(body)["blocked"] is True
+
+
+@pytest.mark.asyncio
+async def test_messages_received_before_read_failure_are_replayed():
+    app = _BodyEchoApp()
+    scanner = _blocking_scanner(app)
+    scanner.SCAN_PREFIX_SIZE = 1024
+
+    receive = _receiver([b"first ", b"second ", b"third"], fail_after=2)
+    status_code, _ = await _run(scanner, _scope(), receive)
+
+    assert status_code == 200
+    assert app.body == b"first second "
+
+
+@pytest.mark.asyncio
+async def test_allow_and_report_path_is_not_blocked_on_patterns():
+    app = _BodyEchoApp()
+    scanner = FileScannerMiddleware(app)
+
+    status_code, _ = await _run(scanner, _scope(), _receiver([b"<script>alert(1)</script>"]))
+
+    assert status_code == 200
+    assert app.body == b"<script>alert(1)</script>"
+
+
+# --- size cap ---
+
+@pytest.mark.asyncio
+async def test_oversized_content_length_to_scanned_path_is_rejected():
+    app = _BodyEchoApp()
+    scanner = _blocking_scanner(app)
+    scope = _scope(content_length=FileScannerMiddleware.MAX_SCAN_SIZE + 1)
+
+    status_code, body = await _run(scanner, scope, _receiver([b"never read"]))
+
+    assert status_code == 413
+    assert not app.called
+    assert orjson.loads(body)["reason"] == "File too large for scanning"
+
+
+@pytest.mark.asyncio
+async def test_content_length_at_cap_is_accepted():
+    app = _BodyEchoApp()
+    scanner = _blocking_scanner(app)
+    scope = _scope(content_length=FileScannerMiddleware.MAX_SCAN_SIZE)
+
+    status_code, _ = await _run(scanner, scope, _receiver([b"small"]))
+
+    assert status_code == 200
+    assert app.called
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_to_allow_and_report_path_is_not_capped():
+    app = _BodyEchoApp()
+    scanner = FileScannerMiddleware(app)
+    scope = _scope(UPLOAD_PATH, content_length=FileScannerMiddleware.MAX_SCAN_SIZE + 1)
+
+    status_code, _ = await _run(scanner, scope, _receiver([b"large analysis upload"]))
+
+    assert status_code == 200
+    assert app.body == b"large analysis upload"
+
+
+# --- content scan ---
+
+@pytest.fixture
+def scanner():
+    return FileScannerMiddleware(app=None)
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"Customer: John Smith, phone 555-0100, email john@example.com",
+    b"The evaluation (eval) of the execution plan was fine.",
+    b"%PDF-1.7 plain document",
+])
+def test_scan_content_benign_samples_are_safe(scanner, content):
+    assert scanner._scan_content(content) == {"safe": True, "reason": ""}
+
+
+@pytest.mark.parametrize("content, description", [
+    (b"<p>hi</p><SCRIPT type='x'>alert(1)</SCRIPT>", "JavaScript script tag"),
+    (b"<a href='JavaScript :alert(1)'>", "JavaScript protocol"),
+    (b"result = eval (user_input)", "JavaScript/Python eval()"),
+    (b"exec(code)", "Python exec()"),
+    (b"__import__('os')", "Python __import__()"),
+    (b"bash   -c 'rm -rf /'", "Bash command execution"),
+    (b"user = 'admin' OR 1=1 --", "SQL injection"),
+    (b"1 union select password from users", "SQL UNION injection"),
+    (b"<img src=x onerror=alert(1)>", "XSS img onerror"),
+])
+def test_scan_content_malicious_samples_report_pattern(scanner, content, description):
+    result = scanner._scan_content(content)
+    assert result == {"safe": False, "reason": f"Malicious pattern detected: {description}"}
+
+
+def test_scan_content_reports_earliest_match_when_several_patterns_occur(scanner):
+    # exec( comes before eval( in the content, although eval() is listed first
+    result = scanner._scan_content(b"exec(a)\n...\neval(b)")
+    assert result["reason"] == "Malicious pattern detected: Python exec()"
+
+
+def test_scan_content_script_tag_spans_lines(scanner):
+    result = scanner._scan_content(b"<script>\nvar x = 1;\n</script>")
+    assert result["reason"] == "Malicious pattern detected: JavaScript script tag"
+
+
+@pytest.mark.parametrize("content, description", [
+    (b"MZ\x90\x00rest of a PE file", "PE executable (Windows)"),
+    (b"\x7fELF\x02\x01\x01", "ELF executable (Linux)"),
+    (b"\xca\xfe\xba\xbe\x00\x00", "Java class file"),
+])
+def test_scan_content_dangerous_signatures(scanner, content, description):
+    result = scanner._scan_content(content)
+    assert result == {"safe": False, "reason": f"Dangerous file type detected: {description}"}
+
+
+def test_scan_content_office_file_with_macros_is_blocked(scanner):
+    result = scanner._scan_content(b"PK\x03\x04...word/vbaProject.bin...ThisWorkbook")
+    assert result["safe"] is False
+    assert result["reason"].startswith("Office file contains macros")
+
+
+def test_scan_content_office_file_without_macros_is_safe(scanner):
+    assert scanner._scan_content(b"PK\x03\x04...word/document.xml...")["safe"] is True
+
+
+def test_scan_content_matches_raw_bytes_that_are_not_utf8(scanner):
+    content = b"\xff\xfe\x80 binary junk \xc3\x28 eval(payload) \xa0\xa1"
+    result = scanner._scan_content(content)
+    assert result["reason"] == "Malicious pattern detected: JavaScript/Python eval()"
+
+
+def test_scan_content_only_searches_scan_prefix(scanner):
+    padding = b"a" * FileScannerMiddleware.SCAN_PREFIX_SIZE
+    assert scanner._scan_content(padding + b"eval(x)")["safe"] is True
+    assert scanner._scan_content(padding[:-7] + b"eval(x)")["safe"] is False
@@ -0,0 +1,69 @@
+"""
+Checks for the lazily loaded model packages (PEP 562 __getattr__ in
+app.models_mongo and app.models).
+
+Run from repo root:
+  cd backend && python -m pytest test_lazy_model_exports.py -v
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+# Ensure backend package is importable
+sys.path.insert(0, str(BACKEND_DIR))
+
+import pytest
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter so earlier imports in this process don't matter."""
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+
+
+def test_mongo_package_import_does_not_load_submodules():
+    result = _run(
+        "import sys, app.models_mongo\n"
+        "loaded = [m for m in sys.modules if m.startswith('app.models_mongo.')]\n"
+        "assert not loaded, loaded\n"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_mongo_submodule_is_loaded_on_first_access():
+    import app.models_mongo as models_mongo
+
+    policies = models_mongo.policies
+
+    assert policies.__name__ == "app.models_mongo.policies"
+    assert hasattr(policies, "Policy")
+
+
+def test_mongo_unknown_attribute_raises_attribute_error():
+    import app.models_mongo as models_mongo
+
+    with pytest.raises(AttributeError):
+        models_mongo.not_a_model
+
+
+def test_sql_export_loads_all_models():
+    pytest.importorskip("sqlalchemy")
+    result = _run(
+        "import sys, app.models\n"
+        "assert 'app.models.alerts' not in sys.modules\n"
+        "from app.models import Alert\n"
+        "assert {'app.models.policies', 'app.models.logs', 'app.models.users'} <= set(sys.modules)\n"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_sql_unknown_attribute_raises_attribute_error():
+    import app.models as models
+
+    with pytest.raises(AttributeError):
+        models.NotAModel
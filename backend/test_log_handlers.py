@@ -0,0 +1,47 @@
+"""
+Checks for the logging handlers in app.utils.log_handlers.
+
+Run from repo root:
+  cd backend && python -m pytest test_log_handlers.py -v
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.log_handlers import BufferedFileHandler, DroppingQueueHandler
+
+
+def _record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, None)
+
+
+def test_full_queue_drops_and_counts_without_handle_error():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+
+    with mock.patch.object(handler, "handleError") as handle_error:
+        for i in range(5):
+            handler.handle(_record(f"message {i}"))
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 3
+    handle_error.assert_not_called()
+
+
+def test_buffered_file_handler_writes_everything_on_close(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = BufferedFileHandler(str(log_file), flush_interval=60)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    for i in range(3):
+        handler.emit(_record(f"line {i}"))
+    handler.close()
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == ["line 0", "line 1", "line 2"]
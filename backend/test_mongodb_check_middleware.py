@@ -0,0 +1,69 @@
+"""
+Checks for MongoDBCheckMiddleware: 503 while MongoDB is not initialized,
+skip paths, and pass-through once it is.
+
+Run from repo root:
+  cd backend && python -m pytest test_mongodb_check_middleware.py -v
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import orjson
+import pytest
+
+from app.middleware import mongodb_check
+from app.middleware.mongodb_check import MongoDBCheckMiddleware
+
+
+async def _downstream(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _get(path: str, initialized: bool):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    with mock.patch.object(mongodb_check, "is_initialized", return_value=initialized):
+        await MongoDBCheckMiddleware(_downstream)(scope, receive, send)
+    headers = dict(sent[0].get("headers", []))
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return sent[0]["status"], headers, body
+
+
+@pytest.mark.asyncio
+async def test_api_request_gets_503_while_mongodb_is_down():
+    status_code, headers, body = await _get("/api/policies/", initialized=False)
+
+    assert status_code == 503
+    assert headers[b"content-type"] == b"application/json"
+    assert orjson.loads(body)["error"] == "MongoDB connection failed"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/", "/health", "/docs", "/openapi.json", "/static/app.js"])
+async def test_skip_paths_pass_through_while_mongodb_is_down(path):
+    status_code, _, body = await _get(path, initialized=False)
+
+    assert status_code == 200
+    assert body == b"ok"
+
+
+@pytest.mark.asyncio
+async def test_api_request_passes_through_once_initialized():
+    status_code, _, body = await _get("/api/policies/", initialized=True)
+
+    assert status_code == 200
+    assert body == b"ok"
@@ -0,0 +1,45 @@
+"""
+Checks for the cached dashboard report endpoints in the monitoring router:
+the days window is bounded, so the report cache cannot grow per distinct value.
+
+Run from repo root:
+  cd backend && python -m pytest test_monitoring_reports.py -v
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_current_admin
+from app.api.routes import monitoring as monitoring_routes
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(monitoring_routes.router)
+    app.dependency_overrides[get_current_admin] = lambda: SimpleNamespace(username="admin")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/monitoring/reports/summary", "/api/monitoring/email/statistics"])
+@pytest.mark.parametrize("days", [0, 366])
+def test_days_outside_window_is_rejected_before_caching(client, path, days):
+    before = len(monitoring_routes._report_cache)
+
+    response = client.get(path, params={"days": days})
+
+    assert response.status_code == 422
+    assert len(monitoring_routes._report_cache) == before
+
+
+def test_report_cache_is_size_bounded():
+    assert monitoring_routes._report_cache.maxsize == monitoring_routes.REPORT_CACHE_MAXSIZE
@@ -0,0 +1,48 @@
+"""
+Checks that GET /api/monitoring/status reports MYDLP_ENABLED from the
+environment without changing the shared MyDLP service.
+
+Run from repo root:
+  cd backend && python -m pytest test_monitoring_status.py -v
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_current_admin
+from app.api.routes import monitoring as monitoring_routes
+from app.services.mydlp_service import get_mydlp_service
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(monitoring_routes.router)
+    app.dependency_overrides[get_current_admin] = lambda: SimpleNamespace(username="admin")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("env_value, expected", [("false", False), ("true", True)])
+def test_status_reports_env_without_mutating_shared_service(client, monkeypatch, env_value, expected):
+    service = get_mydlp_service()
+    before = service.enabled
+    monkeypatch.setenv("MYDLP_ENABLED", env_value)
+
+    # Keep the route from re-reading a developer's backend/.env over the test value
+    with mock.patch("dotenv.load_dotenv"):
+        response = client.get("/api/monitoring/status")
+
+    assert response.status_code == 200
+    assert response.json()["mydlp"]["enabled"] is expected
+    assert get_mydlp_service() is service
+    assert service.enabled == before
@@ -67,7 +67,7 @@ async def test_encrypt_policy_replaces_all_matching_spans():
     with mock.patch.object(svc, "get_active_policies", mock.AsyncMock(return_value=policies)):
         with mock.patch.object(svc, "_create_alert", mock.AsyncMock(return_value=None)):
             with mock.patch.object(svc, "_log_event", noop):
-                with mock.patch.object(svc, "_store_detected_entity", noop):
+                with mock.patch.object(svc, "_store_detected_entities", noop):
                     with mock.patch.object(svc.mydlp, "block_data_transfer", return_value=False):
                         result = await svc.apply_policy_with_entities(
                             detected_entities=list(entities),
@@ -106,7 +106,7 @@ async def test_anonymize_policy_replaces_with_placeholders():
     with mock.patch.object(svc, "get_active_policies", mock.AsyncMock(return_value=policies)):
         with mock.patch.object(svc, "_create_alert", mock.AsyncMock(return_value=None)):
             with mock.patch.object(svc, "_log_event", noop):
-                with mock.patch.object(svc, "_store_detected_entity", noop):
+                with mock.patch.object(svc, "_store_detected_entities", noop):
                     result = await svc.apply_policy_with_entities(
                         detected_entities=list(entities),
                         text=text,
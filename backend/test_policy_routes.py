@@ -0,0 +1,335 @@
+"""
+HTTP-level checks for the policies router, with Policy queries faked
+(no MongoDB needed).
+
+Run from repo root:
+  cd backend && python -m pytest test_policy_routes.py -v
+"""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+
+from app import database_mongo
+from app.api.dependencies import get_current_admin
+from app.api.routes import policies as policies_routes
+from app.models_mongo.policies import (
+    Policy,
+    PolicyListProjection,
+    normalize_entity_types,
+    policy_content_hash,
+)
+
+NEW_POLICY = {"name": "PII block", "entity_types": ["EMAIL_ADDRESS", "PHONE_NUMBER"], "action": "block"}
+
+
+class _FakeQuery:
+    """Stands in for a Beanie FindMany: chainable, resolves to the given documents."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    def skip(self, *args, **kwargs):
+        return self
+
+    def project(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, *args, **kwargs):
+        return list(self.docs)
+
+    async def count(self):
+        return len(self.docs)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(policies_routes.router)
+    app.dependency_overrides[get_current_admin] = lambda: SimpleNamespace(username="admin")
+    return TestClient(app)
+
+
+def test_deleted_route_is_not_captured_by_policy_id_route(client):
+    find = mock.Mock(return_value=_FakeQuery([]))
+    get_live = mock.AsyncMock(side_effect=AssertionError("/{policy_id} handled /deleted"))
+    with mock.patch.object(Policy, "find", find), \
+            mock.patch.object(policies_routes, "_get_live_policy", get_live):
+        response = client.get("/api/policies/deleted")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    find.assert_called_once_with({"is_deleted": True})
+    get_live.assert_not_awaited()
+
+
+class _KeysetQuery(_FakeQuery):
+    """FakeQuery that applies the (-created_at, -_id) order, skip/limit and the keyset $or filter."""
+
+    def __init__(self, docs, query):
+        super().__init__(docs)
+        self.query = query
+        self._skip = 0
+        self._limit = None
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def _matches(self, doc):
+        alternatives = self.query.get("$or")
+        if not alternatives:
+            return True
+        after_time, same_time = alternatives
+        return doc.created_at < after_time["created_at"]["$lt"] or (
+            doc.created_at == same_time["created_at"] and doc.id < same_time["_id"]["$lt"]
+        )
+
+    async def to_list(self, *args, **kwargs):
+        docs = sorted((d for d in self.docs if self._matches(d)), key=lambda d: (d.created_at, d.id), reverse=True)
+        docs = docs[self._skip:]
+        return docs[:self._limit] if self._limit is not None else docs
+
+
+def _listed_policy(i: int, created_at: datetime) -> PolicyListProjection:
+    return PolicyListProjection(
+        _id=ObjectId(), name=f"Policy {i}", entity_types=["EMAIL_ADDRESS"], action="alert", created_at=created_at,
+    )
+
+
+def test_policies_can_be_walked_two_pages_by_cursor(client):
+    start = datetime(2025, 1, 1)
+    # Two policies share a timestamp so the _id tie-break is exercised across the page boundary
+    stamps = [start, start + timedelta(minutes=1), start + timedelta(minutes=1), start + timedelta(minutes=2)]
+    docs = [_listed_policy(i, stamp) for i, stamp in enumerate(stamps)]
+    expected = sorted(docs, key=lambda d: (d.created_at, d.id), reverse=True)
+    find = mock.Mock(side_effect=lambda query: _KeysetQuery(docs, query))
+
+    with mock.patch.object(Policy, "find", find):
+        first = client.get("/api/policies/", params={"limit": 2}).json()
+        second = client.get("/api/policies/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+
+    assert [p["id"] for p in first["items"]] == [str(d.id) for d in expected[:2]]
+    assert first["next_cursor"] and first["has_next"] is True and first["page"] == 1
+
+    assert [p["id"] for p in second["items"]] == [str(d.id) for d in expected[2:]]
+    assert second["next_cursor"] is None
+    assert second["has_next"] is False
+    assert second["page"] is None and second["has_prev"] is None
+    assert second["total"] == 4
+
+
+def _duplicate_key_error(field: str) -> DuplicateKeyError:
+    return DuplicateKeyError(f"E11000 duplicate key error ({field})", 11000, {"keyPattern": {field: 1}})
+
+
+class _InsertFailsPolicy:
+    """Stands in for the Policy document class in create_policy; insert hits a unique index."""
+
+    find_one = mock.AsyncMock(return_value=None)
+    insert_error: DuplicateKeyError = None
+
+    def __init__(self, **data):
+        self.__dict__.update(data)
+
+    async def insert(self):
+        raise self.insert_error
+
+
+# --- duplicate-configuration detection ---
+
+def test_content_hash_ignores_entity_type_order_and_repeats():
+    assert normalize_entity_types(["PHONE", "EMAIL", "PHONE"]) == ["EMAIL", "PHONE"]
+    assert policy_content_hash(["PHONE", "EMAIL", "PHONE"], "block", "high") == \
+        policy_content_hash(["EMAIL", "PHONE"], "block", "high")
+    assert policy_content_hash(["EMAIL"], "block", "high") != policy_content_hash(["EMAIL"], "alert", "high")
+    assert policy_content_hash(["EMAIL"], "block", "high") != policy_content_hash(["EMAIL"], "block", "low")
+
+
+def test_create_rejects_existing_configuration_by_content_hash(client):
+    existing = SimpleNamespace(name="Existing PII policy")
+    find_one = mock.AsyncMock(return_value=existing)
+    payload = {**NEW_POLICY, "entity_types": ["PHONE_NUMBER", "EMAIL_ADDRESS", "EMAIL_ADDRESS"]}
+    with mock.patch.object(Policy, "find_one", find_one):
+        response = client.post("/api/policies/", json=payload)
+
+    assert response.status_code == 400
+    assert "Existing PII policy" in response.json()["detail"]
+    query = find_one.await_args.args[0]
+    assert query == {
+        "content_hash": policy_content_hash(["EMAIL_ADDRESS", "PHONE_NUMBER"], "block", "medium"),
+        "is_deleted": False,
+    }
+
+
+@pytest.mark.parametrize("field, detail", [
+    ("content_hash", "A policy with the same configuration already exists"),
+    ("name", "Policy with this name already exists"),
+])
+def test_create_maps_duplicate_key_error_to_400(client, field, detail):
+    _InsertFailsPolicy.insert_error = _duplicate_key_error(field)
+    with mock.patch.object(policies_routes, "Policy", _InsertFailsPolicy):
+        response = client.post("/api/policies/", json=NEW_POLICY)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+@pytest.mark.parametrize("field, detail", [
+    ("content_hash", "A policy with the same configuration already exists"),
+    ("name", "Policy with this name already exists"),
+])
+def test_restore_maps_duplicate_key_error_to_400(client, field, detail):
+    query = SimpleNamespace(update=mock.AsyncMock(side_effect=_duplicate_key_error(field)))
+    with mock.patch.object(Policy, "find_one", mock.Mock(return_value=query)):
+        response = client.post("/api/policies/64b7f0c2a1b2c3d4e5f60718/restore")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+# --- startup backfill of content_hash ---
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+
+class _FakeAggregation:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length):
+        return list(self.rows)
+
+
+class _FakeCollection:
+    def __init__(self, docs, live_hashed=(), indexes=None, aggregated=()):
+        self.docs = docs
+        self.live_hashed = list(live_hashed)
+        self.indexes = dict(indexes or {})
+        self.aggregated = list(aggregated)
+        self.find_filter = None
+        self.pipeline = None
+        self.bulk_writes = []
+        self.dropped = []
+
+    def find(self, filter, projection=None):
+        if filter.get("content_hash") == {"$type": "string"}:
+            return _FakeCursor(self.live_hashed)
+        self.find_filter = filter
+        return _FakeCursor(self.docs)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append(requests)
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    def aggregate(self, pipeline):
+        self.pipeline = pipeline
+        return _FakeAggregation(self.aggregated)
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+
+
+@pytest.mark.asyncio
+async def test_backfill_sets_hashes_in_bulk_and_soft_deletes_live_duplicates(caplog):
+    stored = policy_content_hash(["EMAIL"], "block", "high")
+    docs = [
+        {"_id": 1, "entity_types": ["PHONE"], "action": "alert", "severity": "low", "is_deleted": False},
+        {"_id": 2, "entity_types": ["PHONE"], "action": "alert", "severity": "low", "is_deleted": False},
+        {"_id": 3, "entity_types": ["EMAIL"], "action": "block", "severity": "high", "is_deleted": False},
+        {"_id": 4, "entity_types": ["EMAIL"], "action": "block", "severity": "high", "is_deleted": True},
+    ]
+    collection = _FakeCollection(docs, live_hashed=[{"_id": 9, "content_hash": stored}])
+
+    await database_mongo._backfill_policy_content_hash(collection)
+
+    assert collection.find_filter == {"content_hash": {"$exists": False}}
+    assert len(collection.bulk_writes) == 1
+    changes = {op._filter["_id"]: op._doc["$set"] for op in collection.bulk_writes[0]}
+    phone = policy_content_hash(["PHONE"], "alert", "low")
+    assert changes[1] == {"content_hash": phone}
+    # Live duplicates keep a correct hash (so later saves don't trip the index) and leave the live set
+    assert changes[2]["content_hash"] == phone and changes[2]["is_deleted"] is True
+    assert changes[3]["content_hash"] == stored and changes[3]["is_deleted"] is True
+    # Soft-deleted policies may share a configuration
+    assert changes[4] == {"content_hash": stored}
+    assert "Policy 2 duplicates the configuration of live policy 1" in caplog.text
+    assert "Policy 3 duplicates the configuration of live policy 9" in caplog.text
+
+
+# --- startup de-duplication of live policy names ---
+
+@pytest.mark.asyncio
+async def test_live_duplicate_names_are_renamed_and_old_index_dropped(caplog):
+    kept, later, latest = ObjectId(), ObjectId(), ObjectId()
+    collection = _FakeCollection(
+        [],
+        indexes={"_id_": {}, "name_1": {}},
+        aggregated=[{"_id": "PII", "ids": [kept, later, latest], "count": 3}],
+    )
+
+    await database_mongo._dedupe_live_policy_names(collection)
+
+    assert collection.pipeline[0] == {"$match": {"is_deleted": False}}
+    names = {op._filter["_id"]: op._doc["$set"]["name"] for op in collection.bulk_writes[0]}
+    assert names == {later: f"PII ({later})", latest: f"PII ({latest})"}
+    assert collection.dropped == ["name_1"]
+    assert f"shares the name 'PII' with live policy {kept}" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_renamed_policy_name_fits_max_length():
+    later = ObjectId()
+    long_name = "n" * database_mongo.POLICY_NAME_MAX_LENGTH
+    collection = _FakeCollection([], aggregated=[{"_id": long_name, "ids": [ObjectId(), later], "count": 2}])
+
+    await database_mongo._dedupe_live_policy_names(collection)
+
+    (op,) = collection.bulk_writes[0]
+    assert len(op._doc["$set"]["name"]) == database_mongo.POLICY_NAME_MAX_LENGTH
+    assert op._doc["$set"]["name"].endswith(f" ({later})")
+    assert collection.dropped == []
+
+
+@pytest.mark.asyncio
+async def test_name_dedupe_skipped_once_unique_index_exists():
+    collection = _FakeCollection([], indexes={"_id_": {}, "name_unique_live": {}})
+
+    await database_mongo._dedupe_live_policy_names(collection)
+
+    assert collection.pipeline is None
+    assert collection.bulk_writes == []
@@ -0,0 +1,194 @@
+"""
+Checks for the bearer-token user cache in get_current_user and the TTLCache behind it:
+token expiry on cache hits, per-user invalidation after writes, per-request copies,
+and size-bounded eviction.
+
+Run from repo root:
+  cd backend && python -m pytest test_token_user_cache.py -v
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+
+from app.api import dependencies
+from app.api.dependencies import get_current_user, invalidate_cached_user
+from app.models_mongo.users import User, UserRole, UserStatus
+from app.utils.ttl_cache import TTLCache
+
+TOKEN = "header.payload.signature"
+USER_ID = PydanticObjectId()
+
+
+def _user(**overrides) -> User:
+    fields = dict(
+        id=USER_ID,
+        username="alice",
+        email="alice@example.com",
+        role=UserRole.REGULAR,
+        status=UserStatus.ACTIVE,
+        is_active=True,
+        assigned_policy_ids=[],
+    )
+    fields.update(overrides)
+    return User.model_construct(**fields)
+
+
+def _payload(exp_offset: float = 3600) -> dict:
+    return {"sub": "alice", "type": "access", "exp": int(time.time() + exp_offset)}
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    dependencies._token_user_cache.clear()
+    yield
+    dependencies._token_user_cache.clear()
+
+
+def _patched(payload, user):
+    find_one = mock.AsyncMock(return_value=user)
+    return (
+        mock.patch.object(dependencies, "decode_access_token", return_value=payload),
+        mock.patch.object(User, "find_one", find_one),
+        find_one,
+    )
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_cache():
+    decode_patch, find_patch, find_one = _patched(_payload(), _user())
+    with decode_patch as decode, find_patch:
+        first = await get_current_user(TOKEN)
+        second = await get_current_user(TOKEN)
+
+    assert first.username == second.username == "alice"
+    assert find_one.await_count == 1
+    assert decode.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_each_request_gets_its_own_copy():
+    decode_patch, find_patch, _ = _patched(_payload(), _user())
+    with decode_patch, find_patch:
+        first = await get_current_user(TOKEN)
+        first.assigned_policy_ids.append("mutated-by-request-1")
+        second = await get_current_user(TOKEN)
+        third = await get_current_user(TOKEN)
+
+    assert second is not third
+    assert second.assigned_policy_ids == []
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_after_token_exp_is_rejected():
+    decode_patch, find_patch, find_one = _patched(_payload(exp_offset=3600), _user())
+    with decode_patch, find_patch:
+        await get_current_user(TOKEN)
+
+    # Token has expired since it was cached: the hit must fall through to decoding, which now fails
+    cached_user, _, version = dependencies._token_user_cache.get(TOKEN)
+    dependencies._token_user_cache.set(TOKEN, (cached_user, time.time() - 1, version))
+    with mock.patch.object(dependencies, "decode_access_token", return_value=None) as decode, \
+            mock.patch.object(User, "find_one", find_one):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(TOKEN)
+
+    assert exc_info.value.status_code == 401
+    assert decode.call_count == 1
+    assert dependencies._token_user_cache.get(TOKEN) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_forces_fresh_lookup():
+    decode_patch, find_patch, find_one = _patched(_payload(), _user())
+    with decode_patch, find_patch:
+        await get_current_user(TOKEN)
+        find_one.return_value = _user(is_active=False)
+        invalidate_cached_user(str(USER_ID))
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(TOKEN)
+
+    assert exc_info.value.status_code == 403
+    assert find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_to_another_user_keep_entry_cached():
+    decode_patch, find_patch, find_one = _patched(_payload(), _user())
+    with decode_patch, find_patch:
+        await get_current_user(TOKEN)
+        invalidate_cached_user(PydanticObjectId())
+        await get_current_user(TOKEN)
+
+    assert find_one.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_overlapping_a_write_is_not_cached():
+    async def find_during_write(*args, **kwargs):
+        # The user is written while this lookup is in flight; its result may be stale
+        invalidate_cached_user(USER_ID)
+        return _user()
+
+    with mock.patch.object(dependencies, "decode_access_token", return_value=_payload()), \
+            mock.patch.object(User, "find_one", mock.AsyncMock(side_effect=find_during_write)):
+        await get_current_user(TOKEN)
+
+    assert dependencies._token_user_cache.get(TOKEN) is None
+
+
+@pytest.mark.asyncio
+async def test_auth_route_user_saves_invalidate_cache():
+    from app.api.routes import auth
+
+    decode_patch, find_patch, find_one = _patched(_payload(), _user())
+    with decode_patch, find_patch:
+        current = await get_current_user(TOKEN)
+        with mock.patch.object(User, "save", mock.AsyncMock()):
+            await auth._save_user(current)
+        await get_current_user(TOKEN)
+
+    assert find_one.await_count == 2
+
+
+def test_ttl_cache_evicts_least_recently_used_beyond_maxsize():
+    cache = TTLCache(ttl_seconds=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_sweeps_expired_entries():
+    cache = TTLCache(ttl_seconds=60, maxsize=100)
+    with mock.patch("app.utils.ttl_cache.time.monotonic", return_value=1000.0):
+        cache._next_sweep = 1060.0
+        for key in range(10):
+            cache.set(key, key)
+    with mock.patch("app.utils.ttl_cache.time.monotonic", return_value=1061.0):
+        cache.set("fresh", 1)
+        assert len(cache) == 1
+        assert cache.get("fresh") == 1
+
+
+def test_ttl_cache_entries_expire():
+    cache = TTLCache(ttl_seconds=60)
+    with mock.patch("app.utils.ttl_cache.time.monotonic", return_value=1000.0):
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+    with mock.patch("app.utils.ttl_cache.time.monotonic", return_value=1060.0):
+        assert cache.get("k") is None
@@ -0,0 +1,143 @@
+"""
+HTTP-level checks for the user list endpoints, with User/Department queries
+faked (no MongoDB needed).
+
+Run from repo root:
+  cd backend && python -m pytest test_user_routes.py -v
+"""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Ensure backend package is importable
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_current_admin_or_manager
+from app.api.routes import users as users_routes
+from app.models_mongo.departments import Department
+from app.models_mongo.users import User, UserListProjection, UserRole, UserStatus
+
+DEPARTMENT_ID = str(ObjectId())
+
+
+class _FakeQuery:
+    """Stands in for a Beanie FindMany: chainable, resolves to the given documents."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    def project(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, *args, **kwargs):
+        return list(self.docs)
+
+    async def count(self):
+        return len(self.docs)
+
+
+def _listed_user(i: int, **overrides) -> UserListProjection:
+    fields = dict(
+        _id=ObjectId(),
+        username=f"user{i}",
+        email=f"user{i}@example.com",
+        status=UserStatus.PENDING,
+        department_id=DEPARTMENT_ID,
+        created_at=datetime(2025, 1, 1) + timedelta(minutes=i),
+    )
+    fields.update(overrides)
+    return UserListProjection(**fields)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(users_routes.router)
+    app.dependency_overrides[get_current_admin_or_manager] = lambda: SimpleNamespace(
+        role=UserRole.ADMIN, username="admin", department_id=None
+    )
+    return TestClient(app)
+
+
+@pytest.fixture
+def departments():
+    department = SimpleNamespace(id=ObjectId(DEPARTMENT_ID), name="Finance")
+    with mock.patch.object(Department, "find", mock.Mock(return_value=_FakeQuery([department]))) as find:
+        yield find
+
+
+def test_get_users_items_match_user_detail_response(client, departments):
+    users = [_listed_user(1, status=UserStatus.ACTIVE, is_active=True, totp_enabled=True)]
+    with mock.patch.object(User, "find", mock.Mock(return_value=_FakeQuery(users))):
+        response = client.get("/api/users/", params={"status": "pending"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1 and body["page"] == 1
+    (item,) = body["items"]
+    assert item == {
+        "id": str(users[0].id),
+        "username": "user1",
+        "email": "user1@example.com",
+        "role": "regular",
+        "status": "active",
+        "is_active": True,
+        "created_at": "2025-01-01T00:01:00",
+        "approved_at": None,
+        "last_login": None,
+        "approved_by": None,
+        "rejection_reason": None,
+        "department_id": DEPARTMENT_ID,
+        "department_name": "Finance",
+        "totp_enabled": True,
+    }
+    departments.assert_called_once()
+
+
+def test_pending_users_returns_validated_list_capped_by_default(client, departments):
+    users = [_listed_user(i) for i in range(3)]
+    query = _FakeQuery(users)
+    with mock.patch.object(User, "find", mock.Mock(return_value=query)), \
+            mock.patch.object(query, "limit", wraps=query.limit) as limit:
+        response = client.get("/api/users/pending")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert len(body) == 3
+    assert body[0]["username"] == "user0" and body[0]["department_name"] == "Finance"
+    limit.assert_called_once_with(200)
+
+
+def test_pending_users_honours_explicit_limit(client, departments):
+    query = _FakeQuery([_listed_user(1)])
+    with mock.patch.object(User, "find", mock.Mock(return_value=query)), \
+            mock.patch.object(query, "limit", wraps=query.limit) as limit:
+        response = client.get("/api/users/pending", params={"limit": 5})
+
+    assert response.status_code == 200
+    limit.assert_called_once_with(5)
+
+
+def test_pending_users_limit_above_cap_is_rejected(client, departments):
+    response = client.get("/api/users/pending", params={"limit": 501})
+
+    assert response.status_code == 422